@@ -2,8 +2,12 @@
 #background https://sanctumpixel.itch.io/forest-lite-pixel-art-tileset
 
 import os
+import sys
 import pygame
 import button
+#image preparation is shared with the game in the folder above
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from assets import prepare_image
 import csv
 import numpy as np
 import tensorflow as tf
@@ -45,14 +49,14 @@ SAVE_FOLDER = 'levels'
 img_list = []
 unscaled_img_list = []
 for x in range (TILE_TYPES):
-  img = pygame.image.load(f'img/tile/dungeon/{x}.png').convert_alpha()
+  img = prepare_image(pygame.image.load(f'img/tile/dungeon/{x}.png'), f'img/tile/dungeon/{x}.png')
   unscaled_img_list.append(img)
   img = pygame.transform.scale(img, (tile_size, tile_size))
   img_list.append(img)
 
-save_img = pygame.transform.scale(pygame.image.load('img/save_btn.png').convert_alpha(), (100, 25))
-load_img = pygame.transform.scale(pygame.image.load('img/load_btn.png').convert_alpha(), (100, 25))
-generate_img = pygame.transform.scale(pygame.image.load('img/generate_btn.png').convert_alpha(), (100, 25))
+save_img = prepare_image(pygame.transform.scale(pygame.image.load('img/save_btn.png'), (100, 25)), 'img/save_btn.png')
+load_img = prepare_image(pygame.transform.scale(pygame.image.load('img/load_btn.png'), (100, 25)), 'img/load_btn.png')
+generate_img = prepare_image(pygame.transform.scale(pygame.image.load('img/generate_btn.png'), (100, 25)), 'img/generate_btn.png')
 
 #define colours
 BG = (35, 35, 35)
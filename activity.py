@@ -0,0 +1,37 @@
+import math
+import pygame
+import constants
+
+class ActivityManager():
+  def __init__(self, enemies):
+    self.frame = 0
+    #spread the reduced rate enemies over different frames so they don't all think at once
+    self.phase = {enemy: i % constants.LOD_TICK_INTERVAL for i, enemy in enumerate(enemies)}
+
+  #enemies near enough to the player to act this frame, with how many frames of movement to make up
+  #a step of 0 means the enemy only animates this frame
+  def update(self, player, world):
+    self.frame += 1
+    wake_distance = constants.WAKE_RADIUS * constants.TILE_SIZE
+    full_rate_distance = constants.FULL_RATE_RADIUS * constants.TILE_SIZE
+    wake_rect = pygame.Rect(0, 0, wake_distance * 2, wake_distance * 2)
+    wake_rect.center = player.rect.center
+
+    active = []
+    #enemies outside the wake radius aren't even looked at
+    for enemy in world.entities.query(wake_rect, "enemy"):
+      #dead enemies leave the spatial hash, and with it the AI loop, for good
+      if not enemy.alive:
+        world.remove_entity(enemy)
+        continue
+      dist = math.hypot(enemy.rect.centerx - player.rect.centerx, enemy.rect.centery - player.rect.centery)
+      if dist > wake_distance:
+        continue
+      if dist <= full_rate_distance:
+        step = 1
+      elif (self.frame + self.phase[enemy]) % constants.LOD_TICK_INTERVAL == 0:
+        step = constants.LOD_TICK_INTERVAL
+      else:
+        step = 0
+      active.append((enemy, step))
+    return active
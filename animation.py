@@ -0,0 +1,36 @@
+import pygame
+from timers import timers
+
+class AnimationClock():
+  def __init__(self, cooldown):
+    self.cooldown = cooldown
+    #frames that have passed since the clock was created
+    self.ticks = 0
+    self.timer = timers.start(pygame.time.get_ticks() + cooldown + 1, self.tick)
+
+  def tick(self):
+    self.ticks += 1
+    self.timer = timers.start(timers.now + self.cooldown + 1, self.tick)
+
+  #phase that makes an animation start from its first frame right now
+  def start_phase(self):
+    return -self.ticks
+
+  def frame(self, phase, frame_count):
+    return (self.ticks + phase) % frame_count
+
+
+class AnimationClocks():
+  def __init__(self):
+    self.clocks = {}
+
+  #animations with the same frame time share one clock, entities only keep their phase
+  def get(self, cooldown):
+    clock = self.clocks.get(cooldown)
+    if clock is None:
+      clock = AnimationClock(cooldown)
+      self.clocks[cooldown] = clock
+    return clock
+
+
+animation_clocks = AnimationClocks()
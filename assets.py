@@ -0,0 +1,75 @@
+import pygame
+import numpy as np
+
+#memory used by every prepared image, filled in as assets are loaded
+asset_report = []
+
+#pick the cheapest pixel format that still draws an image correctly
+def prepare_image(image, name, palette = False):
+  alpha_image = image.convert_alpha()
+  alpha = pygame.surfarray.pixels_alpha(alpha_image)
+  opaque = alpha == 255
+  if opaque.all():
+    kind = "opaque"
+  elif (opaque | (alpha == 0)).all():
+    kind = "colour key"
+  else:
+    kind = "per pixel alpha"
+  del alpha
+
+  if kind == "per pixel alpha":
+    prepared = alpha_image
+  else:
+    colours = pygame.surfarray.array3d(alpha_image)[opaque]
+    key = None
+    if kind == "colour key":
+      key = unused_colour(colours)
+    if palette and len(np.unique(colours, axis = 0)) < 256:
+      prepared = palettize(alpha_image, opaque, key)
+      kind += ", 8 bit palette"
+    else:
+      prepared = alpha_image.convert()
+      if key:
+        pixels = pygame.surfarray.pixels3d(prepared)
+        pixels[~opaque] = key
+        del pixels
+    if key:
+      #run length encoding skips the transparent runs quickly when blitting
+      prepared.set_colorkey(key, pygame.RLEACCEL)
+
+  before = alpha_image.get_width() * alpha_image.get_height() * alpha_image.get_bytesize()
+  after = prepared.get_width() * prepared.get_height() * prepared.get_bytesize()
+  asset_report.append((name, kind, before, after))
+  return prepared
+
+#find a colour the image doesn't use to mark transparent pixels
+def unused_colour(colours):
+  used = set(map(tuple, colours.reshape(-1, 3).tolist()))
+  for key in ((255, 0, 255), (0, 255, 255), (0, 255, 0)):
+    if key not in used:
+      return key
+  for value in range(256 * 256 * 256):
+    key = (value >> 16, (value >> 8) & 255, value & 255)
+    if key not in used:
+      return key
+
+def palettize(image, opaque, key):
+  colours = pygame.surfarray.array3d(image)
+  if key:
+    colours[~opaque] = key
+  palette, indices = np.unique(colours.reshape(-1, 3), axis = 0, return_inverse = True)
+  prepared = pygame.Surface(image.get_size(), 0, 8)
+  prepared.set_palette([tuple(colour) for colour in palette.tolist()])
+  pixels = pygame.surfarray.pixels2d(prepared)
+  pixels[:] = indices.reshape(colours.shape[:2])
+  del pixels
+  return prepared
+
+def print_asset_report():
+  total_before = 0
+  total_after = 0
+  for name, kind, before, after in asset_report:
+    print(f"{name}: {kind}, {before} -> {after} bytes, saved {before - after}")
+    total_before += before
+    total_after += after
+  print(f"assets: {total_before} -> {total_after} bytes, saved {total_before - total_after}")
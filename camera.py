@@ -0,0 +1,73 @@
+import pygame
+import constants
+
+class Camera():
+  def __init__(self, render_scale = constants.RENDER_SCALE):
+    #top left corner of the view in world coordinates
+    self.offset = [0, 0]
+    self.viewport = pygame.Rect(0, 0, constants.SCREEN_WIDTH, constants.SCREEN_HEIGHT)
+    #world units per pixel of the surface drawn to
+    self.render_scale = render_scale
+
+  def follow(self, target):
+    #move the camera when the target gets too close to the edge of the screen
+    moved = False
+    screen_rect = self.to_screen(target)
+
+    #move camera left and right
+    if screen_rect.right > (constants.SCREEN_WIDTH - constants.SCROLL_THRESH):
+      self.offset[0] += screen_rect.right - (constants.SCREEN_WIDTH - constants.SCROLL_THRESH)
+      moved = True
+    if screen_rect.left < constants.SCROLL_THRESH:
+      self.offset[0] -= constants.SCROLL_THRESH - screen_rect.left
+      moved = True
+
+    #move camera up and down
+    if screen_rect.bottom > (constants.SCREEN_HEIGHT - constants.SCROLL_THRESH):
+      self.offset[1] += screen_rect.bottom - (constants.SCREEN_HEIGHT - constants.SCROLL_THRESH)
+      moved = True
+    if screen_rect.top < constants.SCROLL_THRESH:
+      self.offset[1] -= constants.SCROLL_THRESH - screen_rect.top
+      moved = True
+
+    self.viewport.topleft = self.offset
+    return moved
+
+  def reset(self):
+    self.offset = [0, 0]
+    self.viewport.topleft = self.offset
+
+  #independent copy, so a frame can be drawn while the camera keeps following the player
+  #a render scale of 1 gives a camera for drawing at full resolution on the screen
+  def copy(self, render_scale = None):
+    camera = Camera(self.render_scale if render_scale is None else render_scale)
+    camera.offset = list(self.offset)
+    camera.viewport = self.viewport.copy()
+    return camera
+
+  #convert a world rect or position into coordinates on the world render target
+  def apply(self, rect):
+    if self.render_scale == 1:
+      return rect.move(-self.offset[0], -self.offset[1])
+    return pygame.Rect((rect.x - self.offset[0]) // self.render_scale, (rect.y - self.offset[1]) // self.render_scale, rect.width // self.render_scale, rect.height // self.render_scale)
+
+  def apply_pos(self, pos):
+    return ((pos[0] - self.offset[0]) // self.render_scale, (pos[1] - self.offset[1]) // self.render_scale)
+
+  #convert a world rect into full resolution screen coordinates
+  def to_screen(self, rect):
+    return rect.move(-self.offset[0], -self.offset[1])
+
+  #convert a screen position (e.g. the mouse) into world coordinates
+  def to_world(self, pos):
+    return (pos[0] + self.offset[0], pos[1] + self.offset[1])
+
+
+#rect covering an image in world units, which differ from pixels when the world is drawn at low resolution
+def world_rect(image, render_scale = constants.RENDER_SCALE):
+  return pygame.Rect(0, 0, image.get_width() * render_scale, image.get_height() * render_scale)
+
+#render scale a sprite scaled up by scale can be drawn at without losing pixels
+#sprites whose scale isn't a whole multiple of RENDER_SCALE are kept at full resolution and drawn over the upscaled world
+def sprite_render_scale(scale):
+  return constants.RENDER_SCALE if scale % constants.RENDER_SCALE == 0 else 1
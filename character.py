@@ -2,17 +2,26 @@ import pygame
 import math
 import weapon
 import constants
+from timers import timers
+from animation import animation_clocks
 
 class Character():
+  #fixed attribute slots instead of a per object dict, there can be a lot of characters on a big map
+  __slots__ = ("char_type", "boss", "score", "flip", "animations", "animation_list", "clock", "phase", "action", "running",
+               "health", "alive", "hit", "last_hit", "last_attack", "stunned", "hit_timer", "stun_timer", "attack_timer", "image", "rect")
+
   def __init__(self, x, y, health, mob_animations, char_type, boss, size):
     self.char_type = char_type
     self.boss = boss
     self.score = 0
     self.flip = False
-    self.animation_list = mob_animations[char_type]
-    self.frame_index = 0
+    #animation frames indexed by [flip][action][frame]
+    self.animations = mob_animations[char_type]
+    self.animation_list = self.animations[0]
+    #characters share one animation clock, the phase lines the clock up with this character's animation
+    self.clock = animation_clocks.get(constants.CHARACTER_ANIMATION_COOLDOWN)
+    self.phase = self.clock.start_phase()
     self.action = 0#0:idle, 1:run
-    self.update_time = pygame.time.get_ticks()
     self.running = False
     self.health = health
     self.alive = True
@@ -20,13 +29,16 @@ class Character():
     self.last_hit = pygame.time.get_ticks()
     self.last_attack = pygame.time.get_ticks()
     self.stunned = False
+    #timers from the timer wheel, started when first needed
+    self.hit_timer = None
+    self.stun_timer = None
+    self.attack_timer = None
 
-    self.image = self.animation_list[self.action][self.frame_index]
+    self.image = self.animation_list[self.action][0]
     self.rect = pygame.Rect(0, 0, constants.TILE_SIZE * size, constants.TILE_SIZE * size)
     self.rect.center = (x, y)
 
-  def move(self, dx, dy, obstacle_tiles, exit_tile = None):
-    screen_scroll = [0, 0]
+  def move(self, dx, dy, world, exit_tile = None):
     level_complete = False
     self.running = False
 
@@ -43,90 +55,77 @@ class Character():
 
     #check for collision with map in x direction
     self.rect.x += dx
-    for obstacle in obstacle_tiles:
+    for obstacle in world.obstacles_touching(self.rect):
       #check for collision
-      if obstacle[1].colliderect(self.rect):
+      if obstacle.colliderect(self.rect):
         #check which side the collision is from
         if dx > 0:
-          self.rect.right = obstacle[1].left
+          self.rect.right = obstacle.left
         if dx < 0:
-          self.rect.left = obstacle[1].right
+          self.rect.left = obstacle.right
 
     #check for collision with map in y direction
     self.rect.y += dy
-    for obstacle in obstacle_tiles:
+    for obstacle in world.obstacles_touching(self.rect):
       #check for collision
-      if obstacle[1].colliderect(self.rect):
+      if obstacle.colliderect(self.rect):
         #check which side the collision is from
         if dy > 0:
-          self.rect.bottom = obstacle[1].top
+          self.rect.bottom = obstacle.top
         if dy < 0:
-          self.rect.top = obstacle[1].bottom
+          self.rect.top = obstacle.bottom
+    world.move_entity(self)
 
 
     #logic only applicable to player
     if self.char_type == 0:
       #check collision with exit ladder
-      if exit_tile[1].colliderect(self.rect):
+      if exit_tile.colliderect(self.rect):
         #ensure player is close to the center of the exit ladder
-        exit_dist = math.sqrt(((self.rect.centerx - exit_tile[1].centerx) ** 2) + ((self.rect.centery - exit_tile[1].centery) ** 2))
+        exit_dist = math.sqrt(((self.rect.centerx - exit_tile.centerx) ** 2) + ((self.rect.centery - exit_tile.centery) ** 2))
         if exit_dist < 20:
           level_complete = True
 
-      #update scroll based on player position
-      #move camera left and right
-      if self.rect.right > (constants.SCREEN_WIDTH - constants.SCROLL_THRESH):
-        screen_scroll[0] = (constants.SCREEN_WIDTH - constants.SCROLL_THRESH) - self.rect.right
-        self.rect.right = constants.SCREEN_WIDTH - constants.SCROLL_THRESH
-      if self.rect.left < constants.SCROLL_THRESH:
-        screen_scroll[0] = constants.SCROLL_THRESH - self.rect.left
-        self.rect.left = constants.SCROLL_THRESH
-
-      #move camera up and down
-      if self.rect.bottom > (constants.SCREEN_HEIGHT - constants.SCROLL_THRESH):
-        screen_scroll[1] = (constants.SCREEN_HEIGHT - constants.SCROLL_THRESH) - self.rect.bottom
-        self.rect.bottom = constants.SCREEN_HEIGHT - constants.SCROLL_THRESH
-      if self.rect.top < constants.SCROLL_THRESH:
-        screen_scroll[1] = constants.SCROLL_THRESH - self.rect.top
-        self.rect.top = constants.SCROLL_THRESH
+    return level_complete
 
-    return screen_scroll, level_complete
 
-
-  def ai(self, player, obstacle_tiles, screen_scroll, fireball_image):
-    clipped_line = ()
+  #step is how many frames of movement to make up when the enemy isn't updated every frame
+  def ai(self, player, world, fireball_image, step = 1, projectiles = None):
     stun_cooldown = 100
     ai_dx = 0
     ai_dy = 0
     fireball = None
+    speed = constants.ENEMY_SPEED * step
 
-    #reposition the mobs based on screen scroll
-    self.rect.x += screen_scroll[0]
-    self.rect.y += screen_scroll[1]
+    #nothing below applies to dead enemies, so skip the line of sight and distance checks
+    if not self.alive:
+      return fireball
 
-    #create a line of sight from the enemy to the player
-    line_of_sight = ((self.rect.centerx, self.rect.centery), (player.rect.centerx, player.rect.centery))
-    #check if line of sight passes through an obstacle tile
-    for obstacle in obstacle_tiles:
-      if obstacle[1].clipline(line_of_sight):
-        clipped_line = obstacle[1].clipline(line_of_sight)
+    #check if the line of sight from the enemy to the player passes through a wall tile
+    line_of_sight = world.line_of_sight(self.rect.center, player.rect.center)
 
     #check distance to player
     dist = math.sqrt(((self.rect.centerx - player.rect.centerx) ** 2) + ((self.rect.centery - player.rect.centery) ** 2))
-    if not clipped_line and dist > constants.RANGE:
+    if line_of_sight and dist > constants.RANGE:
       if self.rect.centerx > player.rect.centerx:
-        ai_dx = -constants.ENEMY_SPEED
+        ai_dx = -speed
       if self.rect.centerx < player.rect.centerx:
-        ai_dx = constants.ENEMY_SPEED
+        ai_dx = speed
       if self.rect.centery > player.rect.centery:
-        ai_dy = -constants.ENEMY_SPEED
+        ai_dy = -speed
       if self.rect.centery < player.rect.centery:
-        ai_dy = constants.ENEMY_SPEED
+        ai_dy = speed
+    elif not line_of_sight:
+      #walk around walls by following the flow field towards the player
+      next_step = world.flow_field.next_step(world.tile_at(self.rect.centerx, self.rect.centery))
+      if next_step:
+        ai_dx = max(-speed, min(speed, next_step[0] - self.rect.centerx))
+        ai_dy = max(-speed, min(speed, next_step[1] - self.rect.centery))
 
     if self.alive:
       if not self.stunned:
         #move towards player
-        self.move(ai_dx, ai_dy, obstacle_tiles)
+        self.move(ai_dx, ai_dy, world)
         #attack player
         if dist < constants.ATTACK_RANGE and player.hit == False:
           player.health -= 10
@@ -136,9 +135,15 @@ class Character():
         fireball_cooldown = 700
         if self.boss:
           if dist < 500:
-            if pygame.time.get_ticks() - self.last_attack >= fireball_cooldown:
-              fireball = weapon.Fireball(fireball_image, self.rect.centerx, self.rect.centery, player.rect.centerx, player.rect.centery)
+            if self.attack_timer is None:
+              self.attack_timer = timers.start(self.last_attack + fireball_cooldown)
+            if self.attack_timer.expired:
+              if projectiles:
+                projectiles.boss_attack(self.rect.center, player.rect.center)
+              else:
+                fireball = weapon.Fireball(fireball_image, self.rect.centerx, self.rect.centery, player.rect.centerx, player.rect.centery)
               self.last_attack = pygame.time.get_ticks()
+              self.attack_timer = timers.start(self.last_attack + fireball_cooldown)
 
 
       #check if hit
@@ -148,9 +153,13 @@ class Character():
         self.stunned = True
         self.running = False
         self.update_action(0)
+        if self.stun_timer:
+          self.stun_timer.cancel()
+        self.stun_timer = timers.start(self.last_hit + stun_cooldown + 1)
 
-      if (pygame.time.get_ticks() - self.last_hit > stun_cooldown):
+      if self.stun_timer and self.stun_timer.expired:
         self.stunned = False
+        self.stun_timer = None
 
     return fireball
 
@@ -162,9 +171,12 @@ class Character():
 
     #timer to reset player taking a hit
     hit_cooldown = 1000
-    if self.char_type == 0:
-      if self.hit == True and (pygame.time.get_ticks() - self.last_hit) > hit_cooldown:
+    if self.char_type == 0 and self.hit == True:
+      if self.hit_timer is None:
+        self.hit_timer = timers.start(self.last_hit + hit_cooldown + 1)
+      if self.hit_timer.expired:
         self.hit = False
+        self.hit_timer = None
 
     #check what action the player is performing
     if self.running == True:
@@ -172,31 +184,23 @@ class Character():
     else:
       self.update_action(0)#0:idle
 
-    animation_cooldown = 70
     #handle animation
-    #update image
-    self.image = self.animation_list[self.action][self.frame_index]
-    #check if enough time has passed since the last update
-    if pygame.time.get_ticks() - self.update_time > animation_cooldown:
-      self.frame_index += 1
-      self.update_time = pygame.time.get_ticks()
-    #check if the animation has finished
-    if self.frame_index >= len(self.animation_list[self.action]):
-      self.frame_index = 0
+    #update image from the shared clock
+    frame_index = self.clock.frame(self.phase, len(self.animation_list[self.action]))
+    self.image = self.animations[self.flip][self.action][frame_index]
 
 
   def update_action(self, new_action):
     #check if the new action is different to the previous one
     if new_action != self.action:
       self.action = new_action
-      #update the animation settings
-      self.frame_index = 0
-      self.update_time = pygame.time.get_ticks()
+      #start the new animation from its first frame
+      self.phase = self.clock.start_phase()
 
 
-  def draw(self, surface):
-    flipped_image = pygame.transform.flip(self.image, self.flip, False)
+  def draw(self, surface, camera):
+    screen_rect = camera.apply(self.rect)
     if self.char_type == 0:
-      surface.blit(flipped_image, (self.rect.x, self.rect.y - constants.SCALE * constants.OFFSET))
+      return surface.blit(self.image, (screen_rect.x, screen_rect.y - constants.SCALE * constants.OFFSET // constants.RENDER_SCALE))
     else:
-      surface.blit(flipped_image, self.rect)
\ No newline at end of file
+      return surface.blit(self.image, screen_rect)
\ No newline at end of file
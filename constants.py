@@ -10,20 +10,76 @@ FIREBALL_SCALE = 1
 SPEED = 5
 ARROW_SPEED = 10
 FIREBALL_SPEED = 4
+ROTATION_STEP = 2#degrees between cached rotations of weapon sprites
+ROTATION_CACHE_SIZE = 1024
+TEXT_CACHE_SIZE = 256
+TIMER_WHEEL_SIZE = 1024#milliseconds covered by one turn of the timer wheel
+CHARACTER_ANIMATION_COOLDOWN = 70#milliseconds per animation frame
+ITEM_ANIMATION_COOLDOWN = 150
+ATLAS_CHARACTERS = "".join(chr(c) for c in range(32, 127))#printable ascii
 ENEMY_SPEED = 4
 OFFSET = 12
 TILE_SIZE = 16 * SCALE
 TILE_TYPES = 18
+CHUNK_SIZE = 8#tiles per side of a pre-rendered map chunk
+HASH_CELL_SIZE = TILE_SIZE * 2#size of a spatial hash cell for finding nearby characters, items and projectiles
 ROWS = 18
 COLS = 18
 SCROLL_THRESH = 200
 RANGE = 50
 ATTACK_RANGE = 60
+PURSUIT_RANGE = 12#tiles an enemy will walk around walls to reach the player
+ACTIVITY_CULLING = False#only update enemies near the player, and distant ones less often
+WAKE_RADIUS = 12#tiles from the player beyond which enemies sleep
+FULL_RATE_RADIUS = 6#tiles from the player within which enemies think every frame
+LOD_TICK_INTERVAL = 2#frames between updates for enemies between the two radii
+COMPACT_DEAD_ENTITIES = False#drop dead enemies and collected items from the per frame lists
+CORPSE_DECALS = True#when compacting, draw dead enemies into the map instead of dropping them from view
+FOG_OF_WAR = False#hide the parts of the level the player can't see
+FOV_RADIUS = 8#tiles the player can see in every direction
+FOG_EXPLORED_ALPHA = 160#darkness of tiles that have been seen before but aren't visible now
+MINIMAP = False#show an overview of the level below the info panel
+MINIMAP_SIZE = 150#largest side of the minimap in pixels
+PARTICLES = False#bursts of particles for hits, deaths and pickups
+PARTICLE_LIMIT = 1024#particles that can be alive at once
+PARTICLE_SIZE = SCALE
+PARTICLE_DRAG = 0.9#fraction of a particle's speed kept each frame
+PARTICLE_GRAVITY = 0.15
+LIGHTING = False#light the map with torches and a light around the player
+AMBIENT_LIGHT = 0.25#brightness of tiles no light reaches
+TORCH_SPACING = 4#roughly how many wall tiles apart torches are placed
+TORCH_RADIUS = 4#tiles
+TORCH_COLOUR = (255, 190, 120)
+PLAYER_LIGHT_RADIUS = 6#tiles
+PLAYER_LIGHT_COLOUR = (255, 240, 220)
+BATCH_ENEMY_AI = False#update all enemies with array operations instead of one at a time
+DIRTY_RECTS = False#only send the changed parts of the screen to the display
+LOW_RES_RENDER = False#draw the world at the original pixel art size and upscale it once
+RENDER_SCALE = SCALE if LOW_RES_RENDER else 1#world units per pixel of the world render target
+PALETTE_ASSETS = False#store images with few colours as 8 bit palette surfaces to save memory
+ASSET_REPORT = False#print the memory used by every loaded image
+PIPELINED = False#simulate the next frame on a worker thread while the current one is drawn
+PROJECTILE_ENGINE = False#update arrows and fireballs together in arrays instead of one sprite each
+PROJECTILE_LIMIT = 4096#projectiles that can be in flight at once
+BOSS_BULLET_PATTERNS = False#bosses also fire a turning ring of fireballs, needs PROJECTILE_ENGINE
+BOSS_RING_BULLETS = 24
+BOSS_SPIRAL_STEP = 7#degrees the ring turns between volleys
+
+#draw order of dynamic sprites, lower layers are drawn first
+LAYER_MAP = 0
+LAYER_ITEMS = 1
+LAYER_CHARACTERS = 2
+LAYER_WEAPONS = 3
+LAYER_PROJECTILES = 4
+LAYER_FOG = 5
+LAYER_TEXT = 6
+LAYER_HUD = 7
 
 WHITE = (255, 255, 255)
 BLACK = (0, 0, 0)
 PINK = (235, 65, 54)
 RED = (255, 0, 0)
 BG = (40, 25, 25)
+GOLD = (240, 200, 40)
 MENU_BG = (130, 0, 0)
 PANEL = (50, 50, 50)
\ No newline at end of file
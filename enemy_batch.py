@@ -0,0 +1,220 @@
+import pygame
+import numpy as np
+import weapon
+import constants
+from animation import animation_clocks
+
+class EnemyBatch():
+  def __init__(self, enemies):
+    self.enemies = list(enemies)
+    n = len(self.enemies)
+    now = pygame.time.get_ticks()
+
+    #per enemy state kept in arrays so the whole group can be updated at once
+    self.pos = np.array([enemy.rect.topleft for enemy in self.enemies], dtype=np.int64).reshape(n, 2)
+    self.size = np.array([enemy.rect.size for enemy in self.enemies], dtype=np.int64).reshape(n, 2)
+    self.health = np.array([enemy.health for enemy in self.enemies], dtype=np.int64)
+    self.alive = np.array([enemy.alive for enemy in self.enemies], dtype=bool)
+    self.boss = np.array([enemy.boss for enemy in self.enemies], dtype=bool)
+    self.flip = np.array([enemy.flip for enemy in self.enemies], dtype=bool)
+    self.stunned = np.zeros(n, dtype=bool)
+    self.running = np.zeros(n, dtype=bool)
+    self.last_hit = np.full(n, now, dtype=np.int64)
+    self.last_attack = np.full(n, now, dtype=np.int64)
+    self.action = np.zeros(n, dtype=np.int64)
+    #animation frames come from the clock shared by all characters
+    self.clock = animation_clocks.get(constants.CHARACTER_ANIMATION_COOLDOWN)
+    self.phase = np.array([enemy.phase for enemy in self.enemies], dtype=np.int64)
+    self.frame_count = np.array([[len(frames) for frames in enemy.animation_list] for enemy in self.enemies], dtype=np.int64).reshape(n, 2)
+
+  def update(self, player, world, fireball_image, projectiles = None):
+    fireballs = []
+    if not self.enemies:
+      return fireballs
+    now = pygame.time.get_ticks()
+    stun_cooldown = 100
+    fireball_cooldown = 700
+
+    #arrows damage the character objects directly, so pick up their changes first
+    self.health[:] = [enemy.health for enemy in self.enemies]
+    hit = np.array([enemy.hit for enemy in self.enemies], dtype=bool)
+
+    #distances to the player
+    center = self.pos + self.size // 2
+    to_player = np.array(player.rect.center) - center
+    dist = np.hypot(to_player[:, 0], to_player[:, 1])
+
+    #enemies outside the player's field of view are left alone until they are seen
+    tiles = (center + constants.TILE_SIZE // 2) // constants.TILE_SIZE
+    awake = self.alive & self.seen(world, tiles)
+    if constants.ACTIVITY_CULLING:
+      #enemies far from the player sleep
+      awake &= dist <= constants.WAKE_RADIUS * constants.TILE_SIZE
+    active = awake & ~self.stunned
+
+    #line of sight is cached per tile pair, so only distinct tiles are traced
+    unique_tiles, tile_lookup = np.unique(tiles, axis=0, return_inverse=True)
+    visible = np.array([world.line_of_sight((x * constants.TILE_SIZE, y * constants.TILE_SIZE), player.rect.center) for x, y in unique_tiles], dtype=bool)
+    line_of_sight = visible[tile_lookup.reshape(-1)]
+
+    #chase the player directly when it can be seen
+    velocity = np.zeros((len(self.enemies), 2))
+    chase = line_of_sight & (dist > constants.RANGE)
+    velocity[chase] = np.sign(to_player[chase]) * constants.ENEMY_SPEED
+
+    #otherwise walk around walls by following the flow field
+    step = self.flow_steps(world, tiles)
+    follow = ~line_of_sight & (step != -1).all(axis=1)
+    velocity[follow] = np.clip(step[follow] - center[follow], -constants.ENEMY_SPEED, constants.ENEMY_SPEED)
+
+    #move towards player
+    velocity[~active] = 0
+    moved = active & (velocity != 0).any(axis=1)
+    self.running[active] = moved[active]
+    self.flip[velocity[:, 0] < 0] = True
+    self.flip[velocity[:, 0] > 0] = False
+    #control diagonal speed
+    diagonal = (velocity != 0).all(axis=1)
+    velocity[diagonal] *= np.sqrt(2) / 2
+    self.move_axis(world, velocity[:, 0], 0)
+    self.move_axis(world, velocity[:, 1], 1)
+
+    #attack player, only the first enemy in range lands a hit each frame
+    attacking = np.flatnonzero(active & (dist < constants.ATTACK_RANGE))
+    if len(attacking) and player.hit == False:
+      player.health -= 10
+      player.hit = True
+      player.last_hit = now
+
+    #boss enemies shoot fireballs
+    shooting = active & self.boss & (dist < 500) & (now - self.last_attack >= fireball_cooldown)
+    for i in np.flatnonzero(shooting):
+      if projectiles:
+        projectiles.boss_attack((center[i, 0], center[i, 1]), player.rect.center)
+      else:
+        fireballs.append(weapon.Fireball(fireball_image, center[i, 0], center[i, 1], player.rect.centerx, player.rect.centery))
+    self.last_attack[shooting] = now
+
+    #check if hit
+    hit &= awake
+    self.last_hit[hit] = now
+    self.stunned[hit] = True
+    self.running[hit] = False
+    self.set_action(hit, 0)
+    self.stunned[awake & (now - self.last_hit > stun_cooldown)] = False
+
+    #check if characters have died
+    updating = awake.copy()
+    dying = updating & (self.health <= 0)
+    self.health[dying] = 0
+    self.alive[dying] = False
+
+    #handle animation
+    self.set_action(updating & self.running, 1)
+    self.set_action(updating & ~self.running, 0)
+    action = self.action.copy()
+    frame = (self.clock.ticks + self.phase) % self.frame_count[np.arange(len(self.enemies)), action]
+
+    #copy the results back to the character objects used for drawing and collisions
+    positions = self.pos.tolist()
+    health = self.health.tolist()
+    alive = self.alive.tolist()
+    flip = self.flip.tolist()
+    for i, enemy in enumerate(self.enemies):
+      enemy.rect.topleft = positions[i]
+      world.move_entity(enemy)
+      enemy.health = health[i]
+      enemy.alive = alive[i]
+      enemy.flip = flip[i]
+      if dying[i]:
+        world.remove_entity(enemy)
+      if updating[i]:
+        enemy.hit = False
+        enemy.image = enemy.animations[flip[i]][action[i]][frame[i]]
+
+    return fireballs
+
+  #forget the enemies that have died, their rows are removed from every array
+  def compact(self):
+    keep = np.array([enemy.alive for enemy in self.enemies], dtype=bool)
+    self.enemies = [enemy for enemy in self.enemies if enemy.alive]
+    self.pos = self.pos[keep]
+    self.size = self.size[keep]
+    self.health = self.health[keep]
+    self.boss = self.boss[keep]
+    self.flip = self.flip[keep]
+    self.stunned = self.stunned[keep]
+    self.running = self.running[keep]
+    self.last_hit = self.last_hit[keep]
+    self.last_attack = self.last_attack[keep]
+    self.action = self.action[keep]
+    self.phase = self.phase[keep]
+    self.frame_count = self.frame_count[keep]
+    self.alive = self.alive[keep]
+
+  def set_action(self, mask, action):
+    changed = mask & (self.action != action)
+    self.action[changed] = action
+    self.phase[changed] = self.clock.start_phase()
+
+  #which enemies stand on a tile the player can currently see
+  def seen(self, world, tiles):
+    if not world.fog:
+      return np.ones(len(tiles), dtype=bool)
+    visible = world.fog.visible
+    rows, cols = visible.shape
+    inside = (tiles[:, 0] >= 0) & (tiles[:, 0] < cols) & (tiles[:, 1] >= 0) & (tiles[:, 1] < rows)
+    seen = np.zeros(len(tiles), dtype=bool)
+    seen[inside] = visible[tiles[inside, 1], tiles[inside, 0]]
+    return seen
+
+  #centre of the neighbouring tile each enemy should step to, -1 where there is none
+  def flow_steps(self, world, tiles):
+    distance = world.flow_field.distance
+    rows, cols = distance.shape
+    steps = np.full(tiles.shape, -1, dtype=np.int64)
+    inside = (tiles[:, 0] >= 0) & (tiles[:, 0] < cols) & (tiles[:, 1] >= 0) & (tiles[:, 1] < rows)
+    current = np.full(len(tiles), -1)
+    current[inside] = distance[tiles[inside, 1], tiles[inside, 0]]
+    #don't chase from tiles that can't reach the player or are too far away
+    best = np.where((current > 0) & (current <= constants.PURSUIT_RANGE), current, -1)
+    for offset in ((1, 0), (-1, 0), (0, 1), (0, -1)):
+      neighbour = tiles + offset
+      valid = (neighbour[:, 0] >= 0) & (neighbour[:, 0] < cols) & (neighbour[:, 1] >= 0) & (neighbour[:, 1] < rows)
+      neighbour_distance = np.full(len(tiles), -1)
+      neighbour_distance[valid] = distance[neighbour[valid, 1], neighbour[valid, 0]]
+      closer = (neighbour_distance >= 0) & (neighbour_distance < best)
+      best[closer] = neighbour_distance[closer]
+      steps[closer] = neighbour[closer] * constants.TILE_SIZE
+    return steps
+
+  #move every enemy along one axis and push it back out of any wall it enters
+  def move_axis(self, world, velocity, axis):
+    moving = velocity != 0
+    if not moving.any():
+      return
+    #match pygame's rounding of fractional rect moves
+    self.pos[moving, axis] = np.floor(self.pos[moving, axis] + velocity[moving] + 0.5).astype(np.int64)
+
+    half_tile = constants.TILE_SIZE // 2
+    other = 1 - axis
+    start = self.pos[:, axis]
+    end = start + self.size[:, axis] - 1
+    #grid line in front of each mover
+    lead = np.where(velocity > 0, (end + half_tile) // constants.TILE_SIZE, (start + half_tile) // constants.TILE_SIZE)
+    first = (self.pos[:, other] + half_tile) // constants.TILE_SIZE
+    last = (self.pos[:, other] + self.size[:, other] - 1 + half_tile) // constants.TILE_SIZE
+
+    rows, cols = world.walkable.shape
+    blocked = np.zeros(len(velocity), dtype=bool)
+    for k in range(int((last - first).max()) + 1):
+      cell = first + k
+      x, y = (lead, cell) if axis == 0 else (cell, lead)
+      inside = moving & (cell <= last) & (x >= 0) & (x < cols) & (y >= 0) & (y < rows)
+      blocked[inside] |= ~world.walkable[y[inside], x[inside]]
+
+    #check which side the collision is from
+    forward = blocked & (velocity > 0)
+    backward = blocked & (velocity < 0)
+    self.pos[forward, axis] = lead[forward] * constants.TILE_SIZE - half_tile - self.size[forward, axis]
+    self.pos[backward, axis] = lead[backward] * constants.TILE_SIZE + half_tile
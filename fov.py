@@ -0,0 +1,117 @@
+import pygame
+import numpy as np
+import constants
+
+#transforms that map the first octant onto each of the eight octants
+OCTANTS = [
+  (1, 0, 0, 1), (0, 1, 1, 0), (0, -1, 1, 0), (-1, 0, 0, 1),
+  (-1, 0, 0, -1), (0, -1, -1, 0), (0, 1, -1, 0), (1, 0, 0, -1),
+]
+
+#recursive shadowcasting over the walkability grid, walls block sight but are lit themselves
+def field_of_view(walkable, origin, radius):
+  rows, cols = walkable.shape
+  visible = np.zeros((rows, cols), dtype=bool)
+  x, y = origin
+  if not (0 <= y < rows and 0 <= x < cols):
+    return visible
+  visible[y, x] = True
+  for xx, xy, yx, yy in OCTANTS:
+    cast_light(walkable, visible, x, y, 1, 1.0, 0.0, radius, xx, xy, yx, yy)
+  return visible
+
+def cast_light(walkable, visible, cx, cy, row, start, end, radius, xx, xy, yx, yy):
+  if start < end:
+    return
+  rows, cols = walkable.shape
+  radius_squared = radius * radius
+  new_start = start
+  for j in range(row, radius + 1):
+    dx = -j - 1
+    dy = -j
+    blocked = False
+    while dx <= 0:
+      dx += 1
+      #slopes of the left and right edges of this cell
+      left_slope = (dx - 0.5) / (dy + 0.5)
+      right_slope = (dx + 0.5) / (dy - 0.5)
+      if start < right_slope:
+        continue
+      if end > left_slope:
+        break
+      x = cx + dx * xx + dy * xy
+      y = cy + dx * yx + dy * yy
+      inside = 0 <= y < rows and 0 <= x < cols
+      if inside and dx * dx + dy * dy < radius_squared:
+        visible[y, x] = True
+      opaque = not inside or not walkable[y, x]
+      if blocked:
+        #still scanning a run of walls
+        if opaque:
+          new_start = right_slope
+          continue
+        blocked = False
+        start = new_start
+      elif opaque and j < radius:
+        #start of a run of walls, scan the part of the next row it doesn't hide
+        blocked = True
+        cast_light(walkable, visible, cx, cy, j + 1, start, left_slope, radius, xx, xy, yx, yy)
+        new_start = right_slope
+    if blocked:
+      break
+
+
+class FogOfWar():
+  def __init__(self, walkable):
+    self.walkable = walkable
+    rows, cols = walkable.shape
+    self.visible = np.zeros((rows, cols), dtype=bool)
+    self.explored = np.zeros((rows, cols), dtype=bool)
+    self.origin = None
+    #one pixel per tile, the part in view is scaled up when it is drawn
+    self.tile_overlay = pygame.Surface((max(cols, 1), max(rows, 1)), pygame.SRCALPHA)
+    self.overlay = None
+    self.overlay_area = None
+
+  #recompute what the player can see, only when they move to a new tile
+  def update(self, origin):
+    if origin == self.origin:
+      return False
+    self.origin = origin
+    self.visible = field_of_view(self.walkable, origin, constants.FOV_RADIUS)
+    self.explored |= self.visible
+
+    alpha = np.where(self.visible, 0, np.where(self.explored, constants.FOG_EXPLORED_ALPHA, 255)).astype(np.uint8)
+    pixels = pygame.surfarray.pixels_alpha(self.tile_overlay)
+    pixels[:alpha.shape[1], :alpha.shape[0]] = alpha.T
+    del pixels
+    self.overlay_area = None
+    return True
+
+  def is_visible(self, tile):
+    rows, cols = self.visible.shape
+    x, y = tile
+    return 0 <= y < rows and 0 <= x < cols and self.visible[y, x]
+
+  def draw(self, surface, camera):
+    if self.origin is None:
+      return
+    area = view_tiles(camera.viewport, self.visible.shape)
+    if not area:
+      return
+    #only the tiles in view are scaled up, and only again when the mask or the tiles in view change
+    if area != self.overlay_area:
+      tile_pixels = constants.TILE_SIZE // constants.RENDER_SCALE
+      self.overlay = pygame.transform.scale(self.tile_overlay.subsurface(area), (area.width * tile_pixels, area.height * tile_pixels))
+      self.overlay_area = area
+    surface.blit(self.overlay, camera.apply_pos((area.x * constants.TILE_SIZE - constants.TILE_SIZE // 2, area.y * constants.TILE_SIZE - constants.TILE_SIZE // 2)))
+
+
+#the tiles of a map with the given shape that a world rect overlaps, as a rect in tile units
+def view_tiles(view, shape, margin = 0):
+  rows, cols = shape
+  first_x = max((view.left + constants.TILE_SIZE // 2) // constants.TILE_SIZE - margin, 0)
+  first_y = max((view.top + constants.TILE_SIZE // 2) // constants.TILE_SIZE - margin, 0)
+  last_x = min((view.right - 1 + constants.TILE_SIZE // 2) // constants.TILE_SIZE + margin, cols - 1)
+  last_y = min((view.bottom - 1 + constants.TILE_SIZE // 2) // constants.TILE_SIZE + margin, rows - 1)
+  return pygame.Rect(first_x, first_y, max(last_x - first_x + 1, 0), max(last_y - first_y + 1, 0))
@@ -1,6 +1,7 @@
 import pygame
 from pygame import mixer
 import csv
+from concurrent.futures import ThreadPoolExecutor
 
 import requests
 import constants
@@ -9,6 +10,18 @@ from weapon import Weapon
 from items import Item
 from world import World
 from button import Button
+from camera import Camera, sprite_render_scale
+from enemy_batch import EnemyBatch
+from activity import ActivityManager
+from lifecycle import LifecycleManager
+from projectiles import ProjectileEngine
+from minimap import Minimap
+from particles import ParticleSystem
+from sprite_cache import rotation_cache
+from timers import timers
+from renderer import DirtyRectRenderer, RenderQueue
+from text_cache import GlyphAtlas, TextCache
+from assets import prepare_image, print_asset_report
 import os
 from db_helper import DB_Helper
 
@@ -32,12 +45,23 @@ generator = tf.keras.models.load_model(os.path.join("models", "generator.h5"))
 #create clock for maintaining frame rate
 clock = pygame.time.Clock()
 
+#sends the screen to the display, optionally only the parts that changed
+renderer = DirtyRectRenderer(constants.DIRTY_RECTS)
+#the world is drawn onto a smaller surface and upscaled once when rendering at low resolution
+if constants.LOW_RES_RENDER:
+  world_surface = pygame.Surface((constants.SCREEN_WIDTH // constants.RENDER_SCALE, constants.SCREEN_HEIGHT // constants.RENDER_SCALE)).convert()
+else:
+  world_surface = screen
+
+#simulates the next frame while the current one is drawn
+pipeline = ThreadPoolExecutor(max_workers = 1) if constants.PIPELINED else None
+pending_frame = None
+
 #define game variables
 level = 1
 start_game = False
 pause_game = False
 start_intro = False
-screen_scroll = [0, 0]
 difficulty_level = None
 
 #define player movement variables
@@ -48,6 +72,21 @@ moving_down = False
 
 #define font
 font = pygame.font.Font("assets/fonts/AtariClassic.ttf", 20)
+#pre-rasterize the game font so text is composed from cached glyphs
+text_cache = TextCache(GlyphAtlas(font))
+for colour in (constants.WHITE, constants.BLACK, constants.RED):
+  text_cache.atlas.atlas(colour)
+
+#render and measure text, using the cache for the game font
+def render_text(text, font, text_col):
+  if font is text_cache.font:
+    return text_cache.render(text, text_col)
+  return font.render(text, True, text_col)
+
+def text_size(text, font):
+  if font is text_cache.font:
+    return text_cache.size(text)
+  return font.size(text)
 
 #helper function to scale image
 def scale_img(image, scale):
@@ -55,6 +94,16 @@ def scale_img(image, scale):
   h = image.get_height()
   return pygame.transform.scale(image, (w * scale, h * scale))
 
+#scale an image that is drawn in the world, which may be rendered at a lower resolution
+def scale_world_img(image, scale):
+  return scale_img(image, scale / sprite_render_scale(scale))
+
+#load, scale and prepare an image file, world images are scaled for the resolution they are rendered at
+def load_image(path, scale, world = False):
+  image = pygame.image.load(path)
+  image = scale_world_img(image, scale) if world else scale_img(image, scale)
+  return prepare_image(image, path, constants.PALETTE_ASSETS)
+
 #load music and sounds
 pygame.mixer.music.load("assets/audio/music.wav")
 pygame.mixer.music.set_volume(0.3)
@@ -96,14 +145,18 @@ def wrap_text(text, font, max_width):
     words = text.split(' ')
     lines = []
     current_line = ""
+    current_width = 0
+    space_width = text_size(" ", font)[0]
 
     for word in words:
-        test_line = current_line + word + " "
-        if font.size(test_line)[0] <= max_width:
-            current_line = test_line
+        word_width = text_size(word, font)[0] + space_width
+        if current_width + word_width <= max_width:
+            current_line += word + " "
+            current_width += word_width
         else:
             lines.append(current_line)
             current_line = word + " "
+            current_width = word_width
 
     lines.append(current_line)  
     return lines
@@ -128,17 +181,20 @@ def get_feedback():
     response_box_height = 50
 
     show_response = False
+    wrapped_text = None
 
     while collecting_feedback:
         screen.fill((30, 30, 30)) 
 
         # Title (Centered)
         title_text = "How was the previous level?"
-        title_width, _ = font.size(title_text)
+        title_width, _ = text_size(title_text, font)
         draw_text(title_text, font, constants.WHITE, (constants.SCREEN_WIDTH - title_width) // 2, 150)
 
-        # Wrap text inside input box
-        wrapped_lines = wrap_text(feedback_text, font, input_box_width - 20)
+        # Wrap text inside input box, only when the text has changed
+        if feedback_text != wrapped_text:
+            wrapped_lines = wrap_text(feedback_text, font, input_box_width - 20)
+            wrapped_text = feedback_text
         input_box_height = min(min_input_box_height + len(wrapped_lines) * 20, max_input_box_height)
 
         input_box = pygame.Rect(constants.SCREEN_WIDTH // 2 - input_box_width // 2, 200, input_box_width, input_box_height)
@@ -210,21 +266,21 @@ def emotion_response(response):
       screen.fill((30, 30, 30))  
 
       title_text = f"We've changed"
-      title_width, _ = font.size(title_text)
+      title_width, _ = text_size(title_text, font)
       draw_text(title_text, font, constants.WHITE, (constants.SCREEN_WIDTH - title_width) // 2, 150)
 
       title_text_line_2 = f"the dificulty level to:"
-      title_width_line_2, l_ = font.size(title_text_line_2)
+      title_width_line_2, l_ = text_size(title_text_line_2, font)
       draw_text(title_text_line_2, font, constants.WHITE, (constants.SCREEN_WIDTH - title_width_line_2) // 2, 200)
 
       title_text_line_3 = f"{response.upper()}"
-      title_width_line_3, l_ = font.size(title_text_line_3)
+      title_width_line_3, l_ = text_size(title_text_line_3, font)
       draw_text(title_text_line_3, font, constants.WHITE, (constants.SCREEN_WIDTH - title_width_line_3) // 2, 250)
 
 
       # Display assigned task
       task_text = f"Your next task: {assigned_task}"
-      task_width, _ = font.size(task_text)
+      task_width, _ = text_size(task_text, font)
       draw_text(task_text, font, constants.WHITE, (constants.SCREEN_WIDTH - task_width) // 2, 300)
 
       pygame.display.flip()
@@ -249,39 +305,47 @@ Feedback and DB helper blocks end here.
 
 
 #load button images
-start_img = scale_img(pygame.image.load("assets/images/buttons/button_start.png").convert_alpha(), constants.BUTTON_SCALE)
-exit_img = scale_img(pygame.image.load("assets/images/buttons/button_exit.png").convert_alpha(), constants.BUTTON_SCALE)
-restart_img = scale_img(pygame.image.load("assets/images/buttons/button_restart.png").convert_alpha(), constants.BUTTON_SCALE)
-resume_img = scale_img(pygame.image.load("assets/images/buttons/button_resume.png").convert_alpha(), constants.BUTTON_SCALE)
+start_img = load_image("assets/images/buttons/button_start.png", constants.BUTTON_SCALE)
+exit_img = load_image("assets/images/buttons/button_exit.png", constants.BUTTON_SCALE)
+restart_img = load_image("assets/images/buttons/button_restart.png", constants.BUTTON_SCALE)
+resume_img = load_image("assets/images/buttons/button_resume.png", constants.BUTTON_SCALE)
 
 #load heart images
-heart_empty = scale_img(pygame.image.load("assets/images/items/heart_empty.png").convert_alpha(), constants.ITEM_SCALE)
-heart_half = scale_img(pygame.image.load("assets/images/items/heart_half.png").convert_alpha(), constants.ITEM_SCALE)
-heart_full = scale_img(pygame.image.load("assets/images/items/heart_full.png").convert_alpha(), constants.ITEM_SCALE)
+heart_empty = load_image("assets/images/items/heart_empty.png", constants.ITEM_SCALE)
+heart_half = load_image("assets/images/items/heart_half.png", constants.ITEM_SCALE)
+heart_full = load_image("assets/images/items/heart_full.png", constants.ITEM_SCALE)
 
 #load coin images
 coin_images = []
+hud_coin_images = []
 for x in range(4):
-  img = scale_img(pygame.image.load(f"assets/images/items/coin_f{x}.png").convert_alpha(), constants.ITEM_SCALE)
-  coin_images.append(img)
+  img = pygame.image.load(f"assets/images/items/coin_f{x}.png")
+  coin_images.append(prepare_image(scale_world_img(img, constants.ITEM_SCALE), f"assets/images/items/coin_f{x}.png", constants.PALETTE_ASSETS))
+  hud_coin_images.append(prepare_image(scale_img(img, constants.ITEM_SCALE), f"hud coin_f{x}.png", constants.PALETTE_ASSETS))
 
 #load potion image
-red_potion = scale_img(pygame.image.load("assets/images/items/potion_red.png").convert_alpha(), constants.POTION_SCALE)
+red_potion = load_image("assets/images/items/potion_red.png", constants.POTION_SCALE, True)
 
 item_images = []
 item_images.append(coin_images)
 item_images.append(red_potion)
 
 #load weapon images
-bow_image = scale_img(pygame.image.load("assets/images/weapons/bow.png").convert_alpha(), constants.WEAPON_SCALE)
-arrow_image = scale_img(pygame.image.load("assets/images/weapons/arrow.png").convert_alpha(), constants.WEAPON_SCALE)
-fireball_image = scale_img(pygame.image.load("assets/images/weapons/fireball.png").convert_alpha(), constants.FIREBALL_SCALE)
+bow_image = load_image("assets/images/weapons/bow.png", constants.WEAPON_SCALE, True)
+arrow_image = load_image("assets/images/weapons/arrow.png", constants.WEAPON_SCALE, True)
+fireball_image = load_image("assets/images/weapons/fireball.png", constants.FIREBALL_SCALE, True)
+
+#rotate weapon sprites to every angle up front
+rotation_cache.prewarm(bow_image)
+rotation_cache.prewarm(arrow_image)
+rotation_cache.prewarm(fireball_image)
 
 #load tilemap images
 tile_list = []
 for x in range(constants.TILE_TYPES):
-  tile_image = pygame.image.load(f"assets/images/tiles/{x}.png").convert_alpha()
-  tile_image = pygame.transform.scale(tile_image, (constants.TILE_SIZE, constants.TILE_SIZE))
+  tile_image = pygame.image.load(f"assets/images/tiles/{x}.png")
+  tile_image = pygame.transform.scale(tile_image, (constants.TILE_SIZE // constants.RENDER_SCALE, constants.TILE_SIZE // constants.RENDER_SCALE))
+  tile_image = prepare_image(tile_image, f"assets/images/tiles/{x}.png", constants.PALETTE_ASSETS)
   tile_list.append(tile_image)
 
 #load character images
@@ -296,28 +360,41 @@ for mob in mob_types:
     #reset temporary list of images
     temp_list = []
     for i in range(4):
-      img = pygame.image.load(f"assets/images/characters/{mob}/{animation}/{i}.png").convert_alpha()
-      img = scale_img(img, constants.SCALE)
+      img = load_image(f"assets/images/characters/{mob}/{animation}/{i}.png", constants.SCALE, True)
       temp_list.append(img)
     animation_list.append(temp_list)
-  mob_animations.append(animation_list)
+  #pre-flip every frame so left facing characters don't need a new surface each frame
+  flipped_list = []
+  for temp_list in animation_list:
+    flipped_list.append([pygame.transform.flip(img, True, False) for img in temp_list])
+  mob_animations.append([animation_list, flipped_list])
+
+#show how much memory the pixel format choices saved
+if constants.ASSET_REPORT:
+  print_asset_report()
 
 
 #function for outputting text onto the screen
 def draw_text(text, font, text_col, x, y):
-  img = font.render(text, True, text_col)
+  img = render_text(text, font, text_col)
   screen.blit(img, (x, y))
 
 #function for displaying game info
-def draw_info():
+def draw_info(hud):
+  global hud_state
+  health, score, level = hud
+  #the panel only needs sending to the display when something on it changes
+  if hud_state != hud:
+    hud_state = hud
+    renderer.add(pygame.Rect(0, 0, constants.SCREEN_WIDTH, 51))
   pygame.draw.rect(screen, constants.PANEL, (0, 0, constants.SCREEN_WIDTH, 50))
   pygame.draw.line(screen, constants.WHITE, (0, 50), (constants.SCREEN_WIDTH, 50))
   #draw lives
   half_heart_drawn = False
   for i in range(5):
-    if player.health >= ((i + 1) * 20):
+    if health >= ((i + 1) * 20):
       screen.blit(heart_full, (10 + i * 50, 0))
-    elif (player.health % 20 > 0) and half_heart_drawn == False:
+    elif (health % 20 > 0) and half_heart_drawn == False:
       screen.blit(heart_half, (10 + i * 50, 0))
       half_heart_drawn = True
     else:
@@ -326,7 +403,7 @@ def draw_info():
   #level
   draw_text("LEVEL: " + str(level), font, constants.WHITE, constants.SCREEN_WIDTH / 2, 15)
   #show score
-  draw_text(f"X{player.score}", font, constants.WHITE, constants.SCREEN_WIDTH - 100, 15)
+  draw_text(f"X{score}", font, constants.WHITE, constants.SCREEN_WIDTH - 100, 15)
 
 #function to reset level
 def reset_level():
@@ -334,6 +411,10 @@ def reset_level():
   arrow_group.empty()
   item_group.empty()
   fireball_group.empty()
+  if particles:
+    particles.clear()
+  if projectiles:
+    projectiles.clear()
 
   #create empty tile list
   data = []
@@ -347,16 +428,12 @@ def reset_level():
 class DamageText(pygame.sprite.Sprite):
   def __init__(self, x, y, damage, color):
     pygame.sprite.Sprite.__init__(self)
-    self.image = font.render(damage, True, color)
+    self.image = render_text(damage, font, color)
     self.rect = self.image.get_rect()
     self.rect.center = (x, y)
     self.counter = 0
 
   def update(self):
-    #reposition based on screen scroll
-    self.rect.x += screen_scroll[0]
-    self.rect.y += screen_scroll[1]
-
     #move damage text up
     self.rect.y -= 1
     #delete the counter after a few seconds
@@ -364,6 +441,9 @@ class DamageText(pygame.sprite.Sprite):
     if self.counter > 30:
       self.kill()
 
+  def draw(self, surface, camera):
+    return surface.blit(self.image, camera.to_screen(self.rect))
+
 #class for handling screen fade
 class ScreenFade():
   def __init__(self, direction, colour, speed):
@@ -388,6 +468,166 @@ class ScreenFade():
 
     return fade_complete
 
+#everything the game scene needs to draw one frame, captured at the end of its update
+class Frame():
+  def __init__(self):
+    self.render_queue = RenderQueue(world_surface.get_rect(), constants.RENDER_SCALE)
+    #sprites drawn over the world at full screen resolution
+    self.overlay_queue = RenderQueue(screen.get_rect())
+    self.camera = Camera()
+    self.particles = None
+    self.hud = None
+    self.dirty = []
+    self.invalidate = False
+
+#advance the game by one frame, only the frame is read afterwards so this can run on a worker thread
+def update_game(frame):
+  frame.invalidate = False
+  #flag the cooldowns and animation frames that finished since the last frame
+  timers.advance(pygame.time.get_ticks())
+  if player.alive:
+    #calculate player movement
+    dx = 0
+    dy = 0
+    if moving_right == True:
+      dx = constants.SPEED
+    if moving_left == True:
+      dx = -constants.SPEED
+    if moving_up == True:
+      dy = -constants.SPEED
+    if moving_down == True:
+      dy = constants.SPEED
+
+    #move player
+    # todo : removed level completion detection
+    player.move(dx, dy, world, world.exit_tile)
+    #everything on screen shifts when the camera moves
+    if camera.follow(player.rect):
+      frame.invalidate = True
+
+    #update all objects
+    if world.update(player):
+      #the fog and light overlays cover the whole map
+      frame.invalidate = True
+    if enemy_batch:
+      for fireball in enemy_batch.update(player, world, fireball_image, projectiles):
+        fireball_group.add(fireball)
+    else:
+      #without activity culling every enemy thinks every frame
+      active = activity.update(player, world) if activity else [(enemy, 1) for enemy in enemy_list]
+      for enemy, step in active:
+        #enemies in unseen areas don't think or animate
+        if not world.is_visible(enemy.rect.center):
+          continue
+        fireball = enemy.ai(player, world, fireball_image, step, projectiles) if step else None
+        if fireball:
+          fireball_group.add(fireball)
+        if enemy.alive:
+          enemy.update()
+          #dead enemies leave the spatial hash and the minimap
+          if not enemy.alive:
+            world.remove_entity(enemy)
+    player.update()
+    arrow = bow.update(player, camera, projectiles)
+    if arrow:
+      if not projectiles:
+        arrow_group.add(arrow)
+      shot_fx.play()
+    hits = [arrow.update(camera, world, particles) for arrow in arrow_group]
+    if projectiles:
+      hits += projectiles.update(camera, world, player, particles)
+    for damage, damage_pos in hits:
+      if damage:
+        damage_text = DamageText(damage_pos.centerx, damage_pos.y, str(damage), constants.RED)
+        damage_text_group.add(damage_text)
+        hit_fx.play()
+    damage_text_group.update()
+    fireball_group.update(camera, world)
+    #pick up the items the player is touching
+    for item in world.entities.query(player.rect, "item"):
+      world.remove_entity(item)
+      item.collect(player, coin_fx, heal_fx, particles=particles)
+    item_group.update()
+    if particles:
+      particles.update()
+    if minimap:
+      minimap.update()
+    #dead enemies and collected items are removed once the frame's updates are done
+    if lifecycle:
+      lifecycle.compact()
+
+  queue_frame(frame)
+  return frame
+
+#queue a world sprite, the ones kept at full resolution go over the upscaled world instead of onto it
+def queue_sprite(frame, sprite, layer):
+  if sprite.render_scale == constants.RENDER_SCALE:
+    return frame.render_queue.draw(sprite, camera, layer)
+  return frame.overlay_queue.draw(sprite, camera.copy(sprite.render_scale), layer)
+
+#queue the draw calls for the current state, the queues keep the images and positions to use
+def queue_frame(frame):
+  frame.dirty = []
+  #a frame dropped by stop_pipeline still holds the draw calls of the state it was queued from
+  frame.render_queue.clear()
+  frame.overlay_queue.clear()
+  frame.render_queue.draw(world, camera, constants.LAYER_MAP)
+  for item in item_group:
+    #the score coin is drawn over the info panel below
+    if not item.dummy_coin and world.is_visible(item.rect.center):
+      frame.dirty.append(queue_sprite(frame, item, constants.LAYER_ITEMS))
+  for enemy in enemy_list:
+    if world.is_visible(enemy.rect.center):
+      frame.dirty.append(frame.render_queue.draw(enemy, camera, constants.LAYER_CHARACTERS))
+  frame.dirty.append(frame.render_queue.draw(player, camera, constants.LAYER_CHARACTERS))
+  frame.dirty.append(queue_sprite(frame, bow, constants.LAYER_WEAPONS))
+  for arrow in arrow_group:
+    if world.is_visible(arrow.rect.center):
+      frame.dirty.append(queue_sprite(frame, arrow, constants.LAYER_PROJECTILES))
+  for fireball in fireball_group:
+    if world.is_visible(fireball.rect.center):
+      frame.dirty.append(queue_sprite(frame, fireball, constants.LAYER_PROJECTILES))
+  if projectiles:
+    #each projectile is drawn by the queue that matches its image's resolution
+    frame.dirty.append(frame.render_queue.draw(projectiles, camera, constants.LAYER_PROJECTILES))
+    if constants.RENDER_SCALE != 1:
+      frame.dirty.append(frame.overlay_queue.draw(projectiles, camera.copy(1), constants.LAYER_PROJECTILES))
+  if world.fog:
+    frame.render_queue.draw(world.fog, camera, constants.LAYER_FOG)
+  frame.camera = camera.copy()
+  #only the pipeline keeps updating the particles while the frame is drawn, so only it needs a copy
+  frame.particles = particles.snapshot() if particles and constants.PIPELINED else particles
+  for damage_text in damage_text_group:
+    frame.dirty.append(frame.overlay_queue.draw(damage_text, camera, constants.LAYER_TEXT))
+  frame.dirty.append(frame.overlay_queue.draw(score_coin, camera, constants.LAYER_HUD))
+  if minimap:
+    frame.dirty.append(frame.overlay_queue.draw(minimap, camera, constants.LAYER_HUD))
+  frame.hud = (player.health, player.score, level)
+
+def draw_frame(frame):
+  if frame.invalidate:
+    renderer.invalidate()
+  for rect in frame.dirty:
+    renderer.add(rect)
+  world_surface.fill(constants.BG)
+  #particles are written into the pixels between the sprites and the fog
+  frame.render_queue.flush(world_surface, constants.LAYER_PROJECTILES)
+  if frame.particles:
+    renderer.add(frame.particles.draw(world_surface, frame.camera))
+  frame.render_queue.flush(world_surface)
+  if constants.LOW_RES_RENDER:
+    pygame.transform.scale(world_surface, screen.get_size(), screen)
+  frame.overlay_queue.flush(screen, constants.LAYER_TEXT)
+  draw_info(frame.hud)
+  frame.overlay_queue.flush(screen)
+
+#wait for the worker to finish its frame before the game state is replaced
+def stop_pipeline():
+  global pending_frame
+  if pending_frame:
+    pending_frame.result()
+    pending_frame = None
+
 def generate_new_level():
   #generate new level
   GENERATED_LEVEL_SIZE = 16
@@ -444,6 +684,10 @@ world_data = generate_new_level()
 
 world = World()
 world.process_data(world_data, tile_list, item_images, mob_animations)
+minimap = Minimap(world_data, world) if constants.MINIMAP else None
+
+#create camera
+camera = Camera()
 
 #create player
 player = world.player
@@ -452,14 +696,19 @@ bow = Weapon(bow_image, arrow_image)
 
 #extract enemies from world data
 enemy_list = world.character_list
+enemy_batch = EnemyBatch(enemy_list) if constants.BATCH_ENEMY_AI else None
+activity = ActivityManager(enemy_list) if constants.ACTIVITY_CULLING else None
+lifecycle = LifecycleManager(world, enemy_batch, activity) if constants.COMPACT_DEAD_ENTITIES else None
 
 #create sprite groups
 damage_text_group = pygame.sprite.Group()
 arrow_group = pygame.sprite.Group()
 item_group = pygame.sprite.Group()
 fireball_group = pygame.sprite.Group()
+particles = ParticleSystem() if constants.PARTICLES else None
+projectiles = ProjectileEngine(arrow_image, fireball_image) if constants.PROJECTILE_ENGINE else None
 
-score_coin = Item(constants.SCREEN_WIDTH - 115, 23, 0, coin_images, True)
+score_coin = Item(constants.SCREEN_WIDTH - 115, 23, 0, hud_coin_images, True)
 item_group.add(score_coin)
 #add the items from the level data
 for item in world.item_list:
@@ -478,6 +727,9 @@ resume_button = Button(constants.SCREEN_WIDTH // 2 - 175, constants.SCREEN_HEIGH
 
 # todo : temporary level completion handling variable
 level_complete = False
+hud_state = None
+#two frames, so the worker can fill one while the other is drawn
+frames = [Frame(), Frame()]
 
 #main game loop
 run = True
@@ -487,7 +739,8 @@ while run:
   clock.tick(constants.FPS)
 
   if start_game == False:
-    screen.fill(constants.MENU_BG)
+    if renderer.begin_scene("menu"):
+      screen.fill(constants.MENU_BG)
     if start_button.draw(screen):
       start_game = True
       start_intro = True
@@ -498,78 +751,35 @@ while run:
       start_new_game()
       has_trigger_start_event = True
     if pause_game == True:
+      stop_pipeline()
       has_trigger_start_event = False
       end_game()
-      screen.fill(constants.MENU_BG)
+      if renderer.begin_scene("pause"):
+        screen.fill(constants.MENU_BG)
       if resume_button.draw(screen):
         pause_game = False
       if exit_button.draw(screen):
         run = False
     else:
-      screen.fill(constants.BG)
-
-      if player.alive:
-        #calculate player movement
-        dx = 0
-        dy = 0
-        if moving_right == True:
-          dx = constants.SPEED
-        if moving_left == True:
-          dx = -constants.SPEED
-        if moving_up == True:
-          dy = -constants.SPEED
-        if moving_down == True:
-          dy = constants.SPEED
-
-        #move player
-        # todo : removed level completion detection
-        screen_scroll, _ = player.move(dx, dy, world.obstacle_tiles, world.exit_tile)
-
-        #update all objects
-        world.update(screen_scroll)
-        for enemy in enemy_list:
-          fireball = enemy.ai(player, world.obstacle_tiles, screen_scroll, fireball_image)
-          if fireball:
-            fireball_group.add(fireball)
-          if enemy.alive:
-            enemy.update()
-        player.update()
-        arrow = bow.update(player)
-        if arrow:
-          arrow_group.add(arrow)
-          shot_fx.play()
-        for arrow in arrow_group:
-          damage, damage_pos = arrow.update(screen_scroll, world.obstacle_tiles, enemy_list)
-          if damage:
-            damage_text = DamageText(damage_pos.centerx, damage_pos.y, str(damage), constants.RED)
-            damage_text_group.add(damage_text)
-            hit_fx.play()
-        damage_text_group.update()
-        fireball_group.update(screen_scroll, player)
-        item_group.update(screen_scroll, player, coin_fx, heal_fx)
-
-      #draw player on screen
-      world.draw(screen)
-      for enemy in enemy_list:
-        enemy.draw(screen)
-      player.draw(screen)
-      bow.draw(screen)
-      for arrow in arrow_group:
-        arrow.draw(screen)
-      for fireball in fireball_group:
-        fireball.draw(screen)
-      damage_text_group.draw(screen)
-      item_group.draw(screen)
-      draw_info()
-      score_coin.draw(screen)
+      if renderer.begin_scene("game"):
+        hud_state = None
+      if constants.PIPELINED:
+        #draw the frame the worker finished while it simulates the next one
+        frame = pending_frame.result() if pending_frame else update_game(frames[0])
+        pending_frame = pipeline.submit(update_game, frames[1] if frame is frames[0] else frames[0])
+      else:
+        frame = update_game(frames[0])
+      draw_frame(frame)
 
       #check level complete
       if level_complete == True:
 
         level_complete = False
+        stop_pipeline()
 
         start_intro = True
         get_feedback()
+        renderer.invalidate()
         level += 1
         world_data = reset_level()
         
@@ -585,13 +795,18 @@ while run:
 
         world = World()
         world.process_data(world_data, tile_list, item_images, mob_animations)
+        minimap = Minimap(world_data, world) if constants.MINIMAP else None
+        camera.reset()
         temp_hp = player.health
         temp_score = player.score
         player = world.player
         player.health = temp_hp
         player.score = temp_score
         enemy_list = world.character_list
-        score_coin = Item(constants.SCREEN_WIDTH - 115, 23, 0, coin_images, True)
+        enemy_batch = EnemyBatch(enemy_list) if constants.BATCH_ENEMY_AI else None
+        activity = ActivityManager(enemy_list) if constants.ACTIVITY_CULLING else None
+        lifecycle = LifecycleManager(world, enemy_batch, activity) if constants.COMPACT_DEAD_ENTITIES else None
+        score_coin = Item(constants.SCREEN_WIDTH - 115, 23, 0, hud_coin_images, True)
         item_group.add(score_coin)
         #add the items from the level data
         for item in world.item_list:
@@ -600,14 +815,19 @@ while run:
 
       #show intro
       if start_intro == True:
+        renderer.invalidate()
         if intro_fade.fade():
           start_intro = False
           intro_fade.fade_counter = 0
 
       #show death screen
       if player.alive == False:
+        #the fade covers the whole screen until it has finished
+        if death_fade.fade_counter <= constants.SCREEN_WIDTH:
+          renderer.invalidate()
         if death_fade.fade():
           if restart_button.draw(screen):
+            stop_pipeline()
             death_fade.fade_counter = 0
             start_intro = True
             world_data = reset_level()
@@ -619,11 +839,16 @@ while run:
                   world_data[x][y] = int(tile)
             world = World()
             world.process_data(world_data, tile_list, item_images, mob_animations)
+            minimap = Minimap(world_data, world) if constants.MINIMAP else None
+            camera.reset()
             temp_score = player.score
             player = world.player
             player.score = temp_score
             enemy_list = world.character_list
-            score_coin = Item(constants.SCREEN_WIDTH - 115, 23, 0, coin_images, True)
+            enemy_batch = EnemyBatch(enemy_list) if constants.BATCH_ENEMY_AI else None
+            activity = ActivityManager(enemy_list) if constants.ACTIVITY_CULLING else None
+            lifecycle = LifecycleManager(world, enemy_batch, activity) if constants.COMPACT_DEAD_ENTITIES else None
+            score_coin = Item(constants.SCREEN_WIDTH - 115, 23, 0, hud_coin_images, True)
             item_group.add(score_coin)
             #add the items from the level data
             for item in world.item_list:
@@ -659,7 +884,10 @@ while run:
       if event.key == pygame.K_s:
         moving_down = False
 
-  pygame.display.update()
+  renderer.update()
 
 
+if pipeline:
+  stop_pipeline()
+  pipeline.shutdown()
 pygame.quit()
\ No newline at end of file
@@ -1,51 +1,54 @@
 import pygame
+from camera import world_rect, sprite_render_scale
+import constants
+from animation import animation_clocks
 
 class Item(pygame.sprite.Sprite):
+  # Sprite keeps a dict for its group bookkeeping, the item's own attributes go in slots
+  __slots__ = ("item_type", "animation_list", "clock", "phase", "image", "dummy_coin", "render_scale", "rect")
+
   def __init__(self, x, y, item_type, animation_list, dummy_coin = False):
     pygame.sprite.Sprite.__init__(self)
     self.item_type = item_type  # 0: coin, 1: health potion
     self.animation_list = animation_list
-    self.frame_index = 0
-    self.update_time = pygame.time.get_ticks()
-    self.image = self.animation_list[self.frame_index]
-    self.rect = self.image.get_rect()
-    self.rect.center = (x, y)
+    # items share one animation clock, the phase lines the clock up with this item's animation
+    self.clock = animation_clocks.get(constants.ITEM_ANIMATION_COOLDOWN)
+    self.phase = self.clock.start_phase()
+    self.image = self.animation_list[0]
     self.dummy_coin = dummy_coin
+    # potions may be kept at full resolution when the world is drawn at low resolution
+    self.render_scale = sprite_render_scale(constants.POTION_SCALE if item_type == 1 else constants.ITEM_SCALE)
+    # the dummy coin is positioned in screen pixels, other items in world units
+    self.rect = self.image.get_rect() if dummy_coin else world_rect(self.image, self.render_scale)
+    self.rect.center = (x, y)
 
-  def update(self, screen_scroll, player, coin_fx, heal_fx, db_helper=None):
-    # doesn't apply to the dummy coin that is always displayed at the top of the screen
-    if not self.dummy_coin:
-      # reposition based on screen scroll
-      self.rect.x += screen_scroll[0]
-      self.rect.y += screen_scroll[1]
-
-    # check to see if item has been collected by the player
-    if self.rect.colliderect(player.rect):
-      # coin collected
-      if self.item_type == 0:
-        player.score += 1
-        coin_fx.play()
-        # Update achievements when coin is collected
-        if db_helper:
-          db_helper.update_achievements(1)
-      elif self.item_type == 1:
-        player.health += 10
-        heal_fx.play()
-        if player.health > 100:
-          player.health = 100
-      self.kill()
+  # called for the items the player touches, found through the world's spatial hash
+  # doesn't apply to the dummy coin that is always displayed at the top of the screen
+  def collect(self, player, coin_fx, heal_fx, db_helper=None, particles=None):
+    # coin collected
+    if self.item_type == 0:
+      player.score += 1
+      coin_fx.play()
+      # Update achievements when coin is collected
+      if db_helper:
+        db_helper.update_achievements(1)
+    elif self.item_type == 1:
+      player.health += 10
+      heal_fx.play()
+      if player.health > 100:
+        player.health = 100
+    if particles:
+      particles.emit(self.rect.center, 20, constants.GOLD if self.item_type == 0 else constants.PINK, 2, 30)
+    self.kill()
 
+  def update(self):
     # handle animation
-    animation_cooldown = 150
-    # update image
-    self.image = self.animation_list[self.frame_index]
-    # check if enough time has passed since the last update
-    if pygame.time.get_ticks() - self.update_time > animation_cooldown:
-      self.frame_index += 1
-      self.update_time = pygame.time.get_ticks()
-    # check if the animation has finished
-    if self.frame_index >= len(self.animation_list):
-      self.frame_index = 0
+    # update image from the shared clock
+    self.image = self.animation_list[self.clock.frame(self.phase, len(self.animation_list))]
 
-  def draw(self, surface):
-    surface.blit(self.image, self.rect)
\ No newline at end of file
+  def draw(self, surface, camera):
+    # the dummy coin lives in screen coordinates, everything else in world coordinates
+    if self.dummy_coin:
+      return surface.blit(self.image, self.rect)
+    else:
+      return surface.blit(self.image, camera.apply(self.rect))
\ No newline at end of file
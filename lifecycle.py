@@ -0,0 +1,27 @@
+import constants
+
+class LifecycleManager():
+  def __init__(self, world, enemy_batch = None, activity = None):
+    self.world = world
+    self.enemy_batch = enemy_batch
+    self.activity = activity
+
+  #called at the end of each frame, drops the entities that died from the lists that are updated and drawn every frame
+  def compact(self):
+    world = self.world
+    dead = [enemy for enemy in world.character_list if not enemy.alive]
+    if dead:
+      for enemy in dead:
+        world.remove_entity(enemy)
+        if self.activity:
+          self.activity.phase.pop(enemy, None)
+        #the body stays where it fell as part of the map instead of being drawn every frame
+        if constants.CORPSE_DECALS:
+          world.add_decal(enemy.image, enemy.rect)
+      #change the list in place, the game and the minimap hold on to it
+      world.character_list[:] = [enemy for enemy in world.character_list if enemy.alive]
+      if self.enemy_batch:
+        self.enemy_batch.compact()
+    #collected items have already left their sprite group and the spatial hash
+    if not all(item.alive() for item in world.item_list):
+      world.item_list[:] = [item for item in world.item_list if item.alive()]
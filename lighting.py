@@ -0,0 +1,76 @@
+import pygame
+import numpy as np
+from fov import field_of_view, view_tiles
+import constants
+
+class Lighting():
+  def __init__(self, walkable, tile_grid):
+    self.walkable = walkable
+    rows, cols = walkable.shape
+    floor = walkable & (tile_grid >= 0)
+
+    #torches hang on walls that face a floor tile below them, spaced out along the wall
+    below = np.zeros((rows, cols), dtype=bool)
+    below[:-1] = floor[1:]
+    ys, xs = np.nonzero(~walkable & below)
+    self.torches = [(x, y) for x, y in zip(xs.tolist(), ys.tolist()) if (x + y) % constants.TORCH_SPACING == 0]
+
+    #the torches never move, so their light is added up once
+    self.static_light = np.zeros((rows, cols, 3))
+    self.static_light[:] = constants.AMBIENT_LIGHT
+    for torch in self.torches:
+      self.add_light(self.static_light, torch, constants.TORCH_RADIUS, constants.TORCH_COLOUR)
+
+    self.origin = None
+    #one pixel per tile, the part in view is smoothly scaled up when it is drawn
+    self.tile_overlay = pygame.Surface((max(cols, 1), max(rows, 1))).convert()
+    self.overlay = None
+    self.overlay_area = None
+
+  #light spreading out from a tile, blocked by walls and fading with distance
+  def add_light(self, lightmap, tile, radius, colour):
+    #only the tiles within the radius can be lit, so the rest of the map is left alone
+    rows, cols = self.walkable.shape
+    left = max(tile[0] - radius, 0)
+    top = max(tile[1] - radius, 0)
+    right = min(tile[0] + radius + 1, cols)
+    bottom = min(tile[1] + radius + 1, rows)
+    if left >= right or top >= bottom:
+      return
+    lit = field_of_view(self.walkable[top:bottom, left:right], (tile[0] - left, tile[1] - top), radius)
+    ys, xs = np.mgrid[top:bottom, left:right]
+    distance = np.hypot(xs - tile[0], ys - tile[1])
+    intensity = np.where(lit, np.clip(1 - distance / radius, 0, 1), 0)
+    lightmap[top:bottom, left:right] += intensity[:, :, None] * (np.array(colour) / 255)
+
+  #only the player's light moves, it is added again when they enter a new tile
+  def update(self, origin):
+    if origin == self.origin:
+      return False
+    self.origin = origin
+    lightmap = self.static_light.copy()
+    self.add_light(lightmap, origin, constants.PLAYER_LIGHT_RADIUS, constants.PLAYER_LIGHT_COLOUR)
+
+    colours = (np.clip(lightmap, 0, 1) * 255).astype(np.uint8)
+    pixels = pygame.surfarray.pixels3d(self.tile_overlay)
+    pixels[:colours.shape[1], :colours.shape[0]] = colours.transpose(1, 0, 2)
+    del pixels
+    self.overlay_area = None
+    return True
+
+  #darken the map with a single multiplicative blit of the part in view
+  def draw(self, surface, camera):
+    if self.origin is None:
+      return
+    #a tile of margin keeps the smoothing at the edge of the view the same as elsewhere
+    area = view_tiles(camera.viewport, self.walkable.shape, 1)
+    if not area:
+      return
+    #only the tiles around the view are scaled up, and only again when the lightmap or the tiles in view change
+    if area != self.overlay_area:
+      tile_pixels = constants.TILE_SIZE // constants.RENDER_SCALE
+      self.overlay = pygame.transform.smoothscale(self.tile_overlay.subsurface(area), (area.width * tile_pixels, area.height * tile_pixels))
+      self.overlay_area = area
+    origin = camera.apply_pos((area.x * constants.TILE_SIZE - constants.TILE_SIZE // 2, area.y * constants.TILE_SIZE - constants.TILE_SIZE // 2))
+    view = pygame.Rect(-origin[0], -origin[1], camera.viewport.width // constants.RENDER_SCALE, camera.viewport.height // constants.RENDER_SCALE)
+    surface.blit(self.overlay, (0, 0), view, pygame.BLEND_RGB_MULT)
@@ -0,0 +1,19 @@
+from collections import OrderedDict
+
+class LRUCache():
+  def __init__(self, max_size):
+    self.max_size = max_size
+    #least recently used entries are at the front
+    self.entries = OrderedDict()
+
+  #cached value for a key, made with create() and stored when it isn't cached yet
+  def get(self, key, create):
+    value = self.entries.get(key)
+    if value is None:
+      value = create()
+      self.entries[key] = value
+      if len(self.entries) > self.max_size:
+        self.entries.popitem(last = False)
+    else:
+      self.entries.move_to_end(key)
+    return value
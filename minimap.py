@@ -0,0 +1,130 @@
+import pygame
+import numpy as np
+import constants
+
+#colour of each tile type on the map, anything not listed is floor
+FLOOR_COLOUR = (90, 70, 70)
+TILE_COLOURS = {
+  -1: constants.PANEL,
+  7: (170, 160, 160),
+  8: (60, 200, 60),
+}
+HIDDEN_COLOUR = constants.PANEL
+PLAYER_COLOUR = constants.WHITE
+ENEMY_COLOUR = constants.RED
+ITEM_COLOUR = constants.GOLD
+#marker colour of each kind in the spatial hash, most important first for when several share a cell
+MARKER_COLOURS = {"player": PLAYER_COLOUR, "enemy": ENEMY_COLOUR, "item": ITEM_COLOUR}
+MARKER_ORDER = list(MARKER_COLOURS.values())
+
+class Minimap():
+  def __init__(self, data, world):
+    self.world = world
+    tiles = np.full((len(data), max([len(row) for row in data], default = 0)), -1, dtype=np.int64)
+    for y, row in enumerate(data):
+      tiles[y, :len(row)] = row
+    rows, cols = tiles.shape
+
+    #colour of every cell without any markers on it, one pixel per tile
+    self.base = np.empty((max(cols, 1), max(rows, 1), 3), dtype=np.uint8)
+    self.base[:] = constants.PANEL
+    colours = np.empty((rows, cols, 3), dtype=np.uint8)
+    colours[:] = FLOOR_COLOUR
+    for tile, colour in TILE_COLOURS.items():
+      colours[tiles == tile] = colour
+    self.base[:cols, :rows] = colours.transpose(1, 0, 2)
+    self.image = pygame.Surface(self.base.shape[:2]).convert()
+
+    #with fog of war only explored cells are revealed
+    self.revealed = np.zeros(self.base.shape[:2], dtype=bool)
+    if world.fog:
+      pygame.surfarray.blit_array(self.image, np.full(self.base.shape, HIDDEN_COLOUR, dtype=np.uint8))
+    else:
+      self.revealed[:] = True
+      pygame.surfarray.blit_array(self.image, self.base)
+
+    #cell each marked entity is in, and the marked entities in each cell
+    self.positions = {}
+    self.occupants = {}
+    #field of view the markers were last drawn for
+    self.visible = world.fog.visible if world.fog else None
+    scale = max(constants.MINIMAP_SIZE // max(self.base.shape[:2]), 1)
+    self.size = (self.image.get_width() * scale, self.image.get_height() * scale)
+    #the scaled map with a border around it, including the border in the rect
+    self.scaled = None
+    self.rect = pygame.Rect(0, 0, self.size[0] + 2, self.size[1] + 2)
+    self.rect.topright = (constants.SCREEN_WIDTH - 9, 59)
+    self.changed = True
+
+    #items never move, so they are only marked here and unmarked once collected
+    pixels = pygame.surfarray.pixels3d(self.image)
+    for entity in world.item_list + world.character_list + [world.player]:
+      self.place(pixels, entity)
+    del pixels
+
+  #patch the cells that changed since the last frame instead of redrawing the map
+  #only entities the world reports as having moved to a new tile or left are looked at
+  def update(self):
+    pixels = pygame.surfarray.pixels3d(self.image)
+    fog = self.world.fog
+    if fog:
+      explored = fog.explored.T
+      width, height = explored.shape
+      newly = explored & ~self.revealed[:width, :height]
+      if newly.any():
+        self.revealed[:width, :height] |= newly
+        pixels[:width, :height][newly] = self.base[:width, :height][newly]
+        self.changed = True
+      #markers appear and disappear where the field of view changed
+      if fog.visible is not self.visible:
+        ys, xs = np.nonzero(fog.visible ^ self.visible)
+        self.visible = fog.visible
+        for cell in zip(xs.tolist(), ys.tolist()):
+          if cell in self.occupants:
+            self.paint(pixels, cell)
+
+    for entity in self.world.changed:
+      self.place(pixels, entity)
+    self.world.changed.clear()
+    del pixels
+
+  #move an entity's marker to the cell it is in now, or remove it if the entity is gone
+  def place(self, pixels, entity):
+    old = self.positions.pop(entity, None)
+    if old:
+      self.occupants[old].pop(entity)
+      if not self.occupants[old]:
+        del self.occupants[old]
+      self.paint(pixels, old)
+    #dead enemies and collected items have left the spatial hash
+    if entity not in self.world.entities:
+      return
+    colour = MARKER_COLOURS[self.world.entities.kind(entity)]
+    cell = self.world.tile_at(entity.rect.centerx, entity.rect.centery)
+    width, height = self.revealed.shape
+    if 0 <= cell[0] < width and 0 <= cell[1] < height:
+      self.positions[entity] = cell
+      self.occupants.setdefault(cell, {})[entity] = colour
+      self.paint(pixels, cell)
+
+  #draw the most important marker in a cell if the player can see it, otherwise the map underneath
+  def paint(self, pixels, cell):
+    colours = self.occupants.get(cell, {}).values()
+    x, y = cell
+    rows, cols = self.visible.shape if self.visible is not None else (0, 0)
+    seen = self.visible is None or (y < rows and x < cols and self.visible[y, x])
+    if colours and seen:
+      colour = min(colours, key = MARKER_ORDER.index)
+    else:
+      colour = self.base[cell] if self.revealed[cell] else HIDDEN_COLOUR
+    pixels[cell] = colour
+    self.changed = True
+
+  def draw(self, surface, camera):
+    if self.changed:
+      #a new surface each time, the old one may still be queued for drawing
+      self.scaled = pygame.Surface(self.rect.size).convert()
+      self.scaled.fill(constants.WHITE)
+      pygame.transform.scale(self.image, self.size, self.scaled.subsurface((1, 1), self.size))
+      self.changed = False
+    return surface.blit(self.scaled, self.rect)
@@ -0,0 +1,75 @@
+import pygame
+import numpy as np
+import constants
+
+class ParticleSystem():
+  def __init__(self, capacity = constants.PARTICLE_LIMIT):
+    #every particle lives in preallocated arrays, a slot is free when its life reaches 0
+    self.pos = np.zeros((capacity, 2))
+    self.vel = np.zeros((capacity, 2))
+    self.life = np.zeros(capacity, dtype=np.int64)
+    self.max_life = np.ones(capacity, dtype=np.int64)
+    self.colour = np.zeros((capacity, 3), dtype=np.uint8)
+    self.random = np.random.default_rng()
+
+  #burst of particles flying out from a world position, life is in frames
+  def emit(self, pos, count, colour, speed, life):
+    free = np.flatnonzero(self.life <= 0)[:count]
+    n = len(free)
+    if n == 0:
+      return
+    angle = self.random.uniform(0, 2 * np.pi, n)
+    magnitude = self.random.uniform(0.3, 1, n) * speed
+    self.pos[free] = pos
+    self.vel[free, 0] = np.cos(angle) * magnitude
+    self.vel[free, 1] = np.sin(angle) * magnitude
+    lifetimes = self.random.integers(life // 2, life + 1, n)
+    self.life[free] = lifetimes
+    self.max_life[free] = np.maximum(lifetimes, 1)
+    self.colour[free] = colour
+
+  def update(self):
+    #free slots keep moving too, it's cheaper than selecting the live ones
+    self.pos += self.vel
+    self.vel *= constants.PARTICLE_DRAG
+    self.vel[:, 1] += constants.PARTICLE_GRAVITY
+    np.maximum(self.life - 1, 0, out = self.life)
+
+  def clear(self):
+    self.life[:] = 0
+
+  #copy of the current particles that can be drawn while this system keeps updating
+  def snapshot(self):
+    snapshot = ParticleSystem(len(self.life))
+    snapshot.pos[:] = self.pos
+    snapshot.life[:] = self.life
+    snapshot.max_life[:] = self.max_life
+    snapshot.colour[:] = self.colour
+    return snapshot
+
+  #write the particles straight into the surface pixels, returns the area drawn in screen pixels
+  def draw(self, surface, camera):
+    live = np.flatnonzero(self.life > 0)
+    if not len(live):
+      return None
+    size = max(constants.PARTICLE_SIZE // constants.RENDER_SCALE, 1)
+    points = ((self.pos[live] - camera.offset) // constants.RENDER_SCALE).astype(np.int64) - size // 2
+    width, height = surface.get_size()
+    on_screen = (points[:, 0] >= 0) & (points[:, 0] <= width - size) & (points[:, 1] >= 0) & (points[:, 1] <= height - size)
+    points = points[on_screen]
+    live = live[on_screen]
+    if not len(live):
+      return None
+
+    #particles darken over the second half of their life
+    fade = np.minimum(self.life[live] / self.max_life[live] * 2, 1)
+    colours = (self.colour[live] * fade[:, None]).astype(np.uint8)
+    pixels = pygame.surfarray.pixels3d(surface)
+    for dx in range(size):
+      for dy in range(size):
+        pixels[points[:, 0] + dx, points[:, 1] + dy] = colours
+    del pixels
+
+    left, top = points.min(axis = 0)
+    right, bottom = points.max(axis = 0) + size
+    return pygame.Rect(left * constants.RENDER_SCALE, top * constants.RENDER_SCALE, (right - left) * constants.RENDER_SCALE, (bottom - top) * constants.RENDER_SCALE)
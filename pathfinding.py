@@ -0,0 +1,52 @@
+from collections import deque
+import numpy as np
+import constants
+
+class FlowField():
+  def __init__(self, walkable):
+    self.walkable = walkable
+    #number of steps from each tile to the target tile, -1 where it can't be reached
+    self.distance = np.full(walkable.shape, -1, dtype=np.int32)
+    self.target = None
+
+  def update(self, target):
+    #the field only changes when the target moves to a different tile
+    if target == self.target:
+      return False
+    self.target = target
+    self.distance.fill(-1)
+
+    rows, cols = self.walkable.shape
+    x, y = target
+    if not (0 <= y < rows and 0 <= x < cols):
+      return True
+
+    #breadth first search outwards from the target tile
+    self.distance[y, x] = 0
+    queue = deque([target])
+    while queue:
+      x, y = queue.popleft()
+      next_distance = self.distance[y, x] + 1
+      for nx, ny in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)):
+        if 0 <= ny < rows and 0 <= nx < cols and self.walkable[ny, nx] and self.distance[ny, nx] == -1:
+          self.distance[ny, nx] = next_distance
+          queue.append((nx, ny))
+    return True
+
+  #world position of the neighbouring tile one step closer to the target
+  def next_step(self, tile):
+    rows, cols = self.walkable.shape
+    x, y = tile
+    if not (0 <= y < rows and 0 <= x < cols):
+      return None
+    current = self.distance[y, x]
+    #don't chase from tiles that can't reach the target or are too far away
+    if current <= 0 or current > constants.PURSUIT_RANGE:
+      return None
+
+    best = None
+    for nx, ny in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)):
+      if 0 <= ny < rows and 0 <= nx < cols and 0 <= self.distance[ny, nx] < current:
+        current = self.distance[ny, nx]
+        best = (nx * constants.TILE_SIZE, ny * constants.TILE_SIZE)
+    return best
@@ -0,0 +1,151 @@
+import math
+import random
+import pygame
+import numpy as np
+import constants
+from sprite_cache import rotation_cache
+from camera import sprite_render_scale
+
+class ProjectileEngine():
+  def __init__(self, arrow_image, fireball_image, capacity = constants.PROJECTILE_LIMIT):
+    self.arrow_image = arrow_image
+    self.fireball_image = fireball_image
+    #every projectile lives in preallocated arrays, a slot is free when it isn't live
+    self.pos = np.zeros((capacity, 2))
+    self.vel = np.zeros((capacity, 2))
+    #half the width and height of the rotated image in world units
+    self.half = np.zeros((capacity, 2))
+    self.live = np.zeros(capacity, dtype=bool)
+    #arrows are fired by the player and hit enemies, everything else hits the player
+    self.friendly = np.zeros(capacity, dtype=bool)
+    self.visible = np.ones(capacity, dtype=bool)
+    #world units per pixel of each projectile's image
+    self.render_scale = np.ones(capacity, dtype=np.int64)
+    self.images = [None] * capacity
+    #how far the boss's ring of fireballs has turned
+    self.spiral = 0
+
+  #launch projectiles from a world position at angles in degrees, anticlockwise from the right
+  def spawn(self, x, y, angles, speed, image, render_scale, friendly):
+    free = np.flatnonzero(~self.live)[:len(angles)]
+    n = len(free)
+    if n == 0:
+      return 0
+    angles = np.asarray(angles, dtype=float)[:n]
+    radians = np.radians(angles)
+    self.pos[free] = (x, y)
+    self.vel[free, 0] = np.cos(radians) * speed
+    self.vel[free, 1] = -np.sin(radians) * speed#-ve because pygame y coordiate increases down the screen
+    self.live[free] = True
+    self.friendly[free] = friendly
+    self.visible[free] = True
+    self.render_scale[free] = render_scale
+    for i, angle in zip(free.tolist(), angles.tolist()):
+      rotated = rotation_cache.get(image, angle - 90)
+      self.images[i] = rotated
+      self.half[i] = (rotated.get_width() * render_scale / 2, rotated.get_height() * render_scale / 2)
+    return n
+
+  def fire_arrow(self, x, y, angle):
+    return self.spawn(x, y, [angle], constants.ARROW_SPEED, self.arrow_image, sprite_render_scale(constants.WEAPON_SCALE), True) > 0
+
+  #a fireball aimed at the target, and with bullet patterns a turning ring of fireballs around the boss
+  def boss_attack(self, origin, target):
+    aimed = math.degrees(math.atan2(-(target[1] - origin[1]), target[0] - origin[0]))
+    angles = [aimed]
+    if constants.BOSS_BULLET_PATTERNS:
+      ring = self.spiral + np.arange(constants.BOSS_RING_BULLETS) * 360 / constants.BOSS_RING_BULLETS
+      angles = np.concatenate((angles, ring))
+      self.spiral = (self.spiral + constants.BOSS_SPIRAL_STEP) % 360
+    self.spawn(origin[0], origin[1], angles, constants.FIREBALL_SPEED, self.fireball_image, sprite_render_scale(constants.FIREBALL_SCALE), False)
+
+  def clear(self):
+    self.live[:] = False
+
+  #move every projectile and resolve what it hit, returns the damage dealt to enemies and where
+  def update(self, camera, world, player, particles = None):
+    damage_dealt = []
+    live = np.flatnonzero(self.live)
+    if not len(live):
+      return damage_dealt
+    self.pos[live] += self.vel[live]
+    pos = self.pos[live]
+    half = self.half[live]
+    left, top = (pos - half).T
+    right, bottom = (pos + half).T
+
+    #arrows that hit an enemy, the spatial hash narrows the enemies down to the ones around the arrows
+    #and those are all checked against every arrow at once
+    arrows = np.flatnonzero(self.friendly[live])
+    targets = []
+    if len(arrows):
+      first_x, first_y = int(left[arrows].min()), int(top[arrows].min())
+      area = pygame.Rect(first_x, first_y, int(right[arrows].max()) - first_x + 1, int(bottom[arrows].max()) - first_y + 1)
+      targets = [enemy for enemy in world.entities.query(area, "enemy") if enemy.alive]
+    if targets:
+      rects = np.array([enemy.rect for enemy in targets], dtype=float).reshape(len(targets), 4)
+      overlap = ((left[arrows, None] < rects[:, 0] + rects[:, 2]) & (right[arrows, None] > rects[:, 0]) &
+                 (top[arrows, None] < rects[:, 1] + rects[:, 3]) & (bottom[arrows, None] > rects[:, 1]))
+      hitting = overlap.any(axis = 1)
+      #each arrow hits the first enemy it overlaps
+      for arrow, target in zip(arrows[hitting].tolist(), overlap[hitting].argmax(axis = 1).tolist()):
+        enemy = targets[target]
+        damage = 10 + random.randint(-5, 5)
+        enemy.health -= damage
+        enemy.hit = True
+        damage_dealt.append((damage, enemy.rect))
+        if particles:
+          particles.emit(tuple(pos[arrow]), 12, constants.RED, 3, 20)
+          if enemy.health <= 0:
+            particles.emit(enemy.rect.center, 40, constants.PINK, 4, 40)
+        self.live[live[arrow]] = False
+
+    #fireballs that hit the player, only the first one lands while the player is recovering from a hit
+    fireballs = np.flatnonzero(~self.friendly[live] & self.live[live])
+    if len(fireballs) and not player.hit:
+      rect = player.rect
+      overlap = (left[fireballs] < rect.right) & (right[fireballs] > rect.left) & (top[fireballs] < rect.bottom) & (bottom[fireballs] > rect.top)
+      if overlap.any():
+        player.hit = True
+        player.last_hit = pygame.time.get_ticks()
+        player.health -= 10
+        self.live[live[fireballs[overlap.argmax()]]] = False
+
+    #projectiles are smaller than a tile, so the tiles under their corners are every wall they can touch
+    walkable = world.walkable
+    rows, cols = walkable.shape
+    wall = np.zeros(len(live), dtype=bool)
+    for x, y in ((left, top), (right - 1, top), (left, bottom - 1), (right - 1, bottom - 1)):
+      tile_x = ((x + constants.TILE_SIZE // 2) // constants.TILE_SIZE).astype(np.int64)
+      tile_y = ((y + constants.TILE_SIZE // 2) // constants.TILE_SIZE).astype(np.int64)
+      inside = (tile_x >= 0) & (tile_x < cols) & (tile_y >= 0) & (tile_y < rows)
+      wall[inside] |= ~walkable[tile_y[inside], tile_x[inside]]
+    self.live[live[wall]] = False
+
+    #projectiles that have gone off screen
+    view = camera.viewport
+    off_screen = (right <= view.left) | (left >= view.right) | (bottom <= view.top) | (top >= view.bottom)
+    self.live[live[off_screen]] = False
+
+    #projectiles in unseen areas aren't drawn
+    if world.fog:
+      visible = world.fog.visible
+      tile_x = ((pos[:, 0] + constants.TILE_SIZE // 2) // constants.TILE_SIZE).astype(np.int64)
+      tile_y = ((pos[:, 1] + constants.TILE_SIZE // 2) // constants.TILE_SIZE).astype(np.int64)
+      inside = (tile_x >= 0) & (tile_x < cols) & (tile_y >= 0) & (tile_y < rows)
+      seen = np.zeros(len(live), dtype=bool)
+      seen[inside] = visible[tile_y[inside], tile_x[inside]]
+      self.visible[live] = seen
+    return damage_dealt
+
+  #blit every live projectile whose image matches the camera's render scale, returns the area drawn
+  def draw(self, surface, camera):
+    shown = np.flatnonzero(self.live & self.visible & (self.render_scale == camera.render_scale))
+    if not len(shown):
+      return None
+    corners = ((self.pos[shown] - self.half[shown] - camera.offset) // camera.render_scale).astype(np.int64).tolist()
+    #blits that were off screen report an empty rect
+    drawn = [rect for rect in (surface.blit(self.images[i], corner) for i, corner in zip(shown.tolist(), corners)) if rect]
+    if not drawn:
+      return None
+    return drawn[0].unionall(drawn[1:])
@@ -0,0 +1,75 @@
+import pygame
+
+class DirtyRectRenderer():
+  def __init__(self, enabled):
+    self.enabled = enabled
+    self.scene = None
+    self.full_update = True
+    #areas drawn this frame, and last frame so their old contents get cleared
+    self.dirty = []
+    self.previous = []
+
+  #returns True when the static background of a scene has to be drawn again
+  def begin_scene(self, scene):
+    if scene != self.scene:
+      self.scene = scene
+      self.full_update = True
+      return True
+    return not self.enabled
+
+  def add(self, rect):
+    if rect:
+      self.dirty.append(rect)
+
+  #mark the whole screen as changed, e.g. when the camera moves or during a fade
+  def invalidate(self):
+    self.full_update = True
+
+  def update(self):
+    if not self.enabled or self.full_update:
+      pygame.display.update()
+    elif self.dirty or self.previous:
+      pygame.display.update(self.previous + self.dirty)
+    self.previous = self.dirty
+    self.dirty = []
+    self.full_update = False
+
+
+class RenderQueue():
+  def __init__(self, viewport, scale = 1):
+    self.viewport = viewport
+    #screen pixels per pixel of the surface the queue is flushed to
+    self.scale = scale
+    self.layers = {}
+    self.layer = 0
+
+  #queue an object's draw call, the object blits to the queue as if it was the screen
+  def draw(self, drawable, camera, layer):
+    self.layer = layer
+    return drawable.draw(self, camera)
+
+  def blit(self, source, dest, area = None, special_flags = 0):
+    rect = pygame.Rect(dest[0], dest[1], 0, 0)
+    rect.size = area.size if area else source.get_size()
+    #skip sprites that are completely off screen
+    if not self.viewport.colliderect(rect):
+      return pygame.Rect(rect.topleft, (0, 0))
+    self.layers.setdefault(self.layer, []).append((source, rect.topleft, area, special_flags))
+    #report the area covered on the screen
+    rect = rect.clip(self.viewport)
+    if self.scale != 1:
+      rect = pygame.Rect(rect.x * self.scale, rect.y * self.scale, rect.width * self.scale, rect.height * self.scale)
+    return rect
+
+  #forget queued draw calls that were never flushed
+  def clear(self):
+    self.layers = {}
+
+  #submit everything in layer order with a single blits call, or only the layers up to last_layer
+  def flush(self, surface, last_layer = None):
+    sequence = []
+    for layer in sorted(self.layers):
+      if last_layer is None or layer <= last_layer:
+        sequence.extend(self.layers.pop(layer))
+    if sequence:
+      surface.blits(sequence, doreturn = False)
@@ -0,0 +1,61 @@
+import constants
+
+class SpatialHash():
+  def __init__(self, cell_size = constants.HASH_CELL_SIZE):
+    self.cell_size = cell_size
+    #objects in each (kind, x, y) cell
+    self.cells = {}
+    #kind, covered cell range and insertion number of every object in the hash
+    self.entries = {}
+    self.inserted = 0
+
+  def cell_range(self, rect):
+    return (rect.left // self.cell_size, rect.top // self.cell_size, (rect.right - 1) // self.cell_size, (rect.bottom - 1) // self.cell_size)
+
+  def keys(self, kind, cells):
+    first_x, first_y, last_x, last_y = cells
+    return [(kind, x, y) for y in range(first_y, last_y + 1) for x in range(first_x, last_x + 1)]
+
+  #add an object with a rect, kind separates e.g. enemies from items so queries only see what they ask for
+  def insert(self, obj, kind, order = None):
+    if order is None:
+      order = self.inserted
+      self.inserted += 1
+    cells = self.cell_range(obj.rect)
+    self.entries[obj] = (kind, cells, order)
+    for key in self.keys(kind, cells):
+      self.cells.setdefault(key, set()).add(obj)
+
+  def __contains__(self, obj):
+    return obj in self.entries
+
+  def kind(self, obj):
+    return self.entries[obj][0]
+
+  def remove(self, obj):
+    entry = self.entries.pop(obj, None)
+    if entry is None:
+      return
+    kind, cells, order = entry
+    for key in self.keys(kind, cells):
+      cell = self.cells[key]
+      cell.remove(obj)
+      if not cell:
+        del self.cells[key]
+
+  #call after an object's rect changed, nothing happens unless it entered different cells
+  def move(self, obj):
+    entry = self.entries.get(obj)
+    if entry is None or entry[1] == self.cell_range(obj.rect):
+      return
+    self.remove(obj)
+    self.insert(obj, entry[0], entry[2])
+
+  #objects of one kind overlapping a rect, in the order they were added
+  def query(self, rect, kind):
+    found = set()
+    for key in self.keys(kind, self.cell_range(rect)):
+      for obj in self.cells.get(key, ()):
+        if obj.rect.colliderect(rect):
+          found.add(obj)
+    return sorted(found, key = lambda obj: self.entries[obj][2])
@@ -0,0 +1,25 @@
+import pygame
+import constants
+from lru_cache import LRUCache
+
+class RotationCache():
+  def __init__(self, step = constants.ROTATION_STEP, max_size = constants.ROTATION_CACHE_SIZE):
+    self.step = step
+    self.images = LRUCache(max_size)
+
+  def quantize(self, angle):
+    return (round(angle / self.step) * self.step) % 360
+
+  def get(self, image, angle):
+    angle = self.quantize(angle)
+    return self.images.get((image, angle), lambda: pygame.transform.rotate(image, angle))
+
+  #rotate an image to every angle bucket up front so nothing is rotated during play
+  def prewarm(self, image):
+    angle = 0
+    while angle < 360:
+      self.get(image, angle)
+      angle += self.step
+
+
+rotation_cache = RotationCache()
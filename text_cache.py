@@ -0,0 +1,74 @@
+import threading
+import pygame
+import constants
+from lru_cache import LRUCache
+
+class GlyphAtlas():
+  def __init__(self, font, characters = constants.ATLAS_CHARACTERS):
+    self.font = font
+    self.characters = characters
+    #position and size of every character inside an atlas strip
+    self.glyph_rects = {}
+    x = 0
+    for char in characters:
+      width, height = font.size(char)
+      self.glyph_rects[char] = pygame.Rect(x, 0, width, height)
+      x += width
+    self.width = x
+    self.height = max([rect.height for rect in self.glyph_rects.values()], default = font.get_height())
+    #one strip of pre-rendered characters per colour
+    self.atlases = {}
+
+  def atlas(self, colour):
+    colour = tuple(colour)
+    atlas = self.atlases.get(colour)
+    if atlas is None:
+      atlas = pygame.Surface((self.width, self.height), pygame.SRCALPHA)
+      for char, rect in self.glyph_rects.items():
+        atlas.blit(self.font.render(char, True, colour), rect)
+      self.atlases[colour] = atlas
+    return atlas
+
+  def size(self, text):
+    width = 0
+    #strings are as tall as their tallest character, like Font.size
+    height = 0
+    for char in text:
+      rect = self.glyph_rects.get(char)
+      if not rect:
+        return self.font.size(text)
+      width += rect.width
+      height = max(height, rect.height)
+    return width, height or self.font.get_height()
+
+  #compose a string from the glyphs in the atlas instead of rasterizing it again
+  def render(self, text, colour):
+    if any(char not in self.glyph_rects for char in text):
+      return self.font.render(text, True, colour)
+    atlas = self.atlas(colour)
+    image = pygame.Surface(self.size(text), pygame.SRCALPHA)
+    x = 0
+    glyphs = []
+    for char in text:
+      rect = self.glyph_rects[char]
+      #copy the glyph pixels, including alpha, onto the transparent surface
+      glyphs.append((atlas, (x, 0), rect, pygame.BLEND_RGBA_MAX))
+      x += rect.width
+    image.blits(glyphs, doreturn = False)
+    return image
+
+
+class TextCache():
+  def __init__(self, atlas, max_size = constants.TEXT_CACHE_SIZE):
+    self.atlas = atlas
+    self.font = atlas.font
+    self.images = LRUCache(max_size)
+    #damage text is rendered on the pipeline's worker thread while the main thread draws the info panel
+    self.lock = threading.Lock()
+
+  def render(self, text, colour):
+    with self.lock:
+      return self.images.get((text, tuple(colour)), lambda: self.atlas.render(text, colour))
+
+  def size(self, text):
+    return self.atlas.size(text)
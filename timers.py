@@ -0,0 +1,56 @@
+import constants
+
+class Timer():
+  def __init__(self, due, callback = None):
+    self.due = due
+    self.callback = callback
+    #set by the wheel once the due time has passed, so owners only read a flag
+    self.expired = False
+    self.cancelled = False
+
+  def cancel(self):
+    self.cancelled = True
+
+
+class TimerWheel():
+  def __init__(self, size = constants.TIMER_WHEEL_SIZE):
+    #one slot per millisecond, timers further ahead than the wheel stay in their slot until a later lap
+    self.slots = [[] for _ in range(size)]
+    self.now = None
+
+  #start a timer that expires at an absolute pygame.time.get_ticks() value
+  def start(self, due, callback = None):
+    timer = Timer(due, callback)
+    if self.now is not None and due <= self.now:
+      self.expire(timer)
+    else:
+      self.slots[due % len(self.slots)].append(timer)
+    return timer
+
+  def expire(self, timer):
+    timer.expired = True
+    if timer.callback:
+      timer.callback()
+
+  #called once per frame, only visits the slots for the time that has passed
+  def advance(self, now):
+    size = len(self.slots)
+    first = now - size + 1 if self.now is None else max(self.now + 1, now - size + 1)
+    self.now = now
+    for time in range(first, now + 1):
+      slot = self.slots[time % size]
+      if not slot:
+        continue
+      waiting = []
+      for timer in slot:
+        if timer.cancelled:
+          continue
+        if timer.due <= now:
+          self.expire(timer)
+        else:
+          waiting.append(timer)
+      self.slots[time % size] = waiting
+
+
+#shared by everything in the game, advanced at the start of each frame
+timers = TimerWheel()
@@ -2,33 +2,48 @@ import pygame
 import math
 import random
 import constants
+from sprite_cache import rotation_cache
+from camera import world_rect, sprite_render_scale
+from timers import timers
 
 class Weapon():
+  __slots__ = ("original_image", "angle", "image", "arrow_image", "render_scale", "rect", "fired", "last_shot", "shot_timer")
+
   def __init__(self, image, arrow_image):
     self.original_image = image
     self.angle = 0
-    self.image = pygame.transform.rotate(self.original_image, self.angle)
+    self.image = rotation_cache.get(self.original_image, self.angle)
     self.arrow_image = arrow_image
-    self.rect = self.image.get_rect()
+    self.render_scale = sprite_render_scale(constants.WEAPON_SCALE)
+    self.rect = world_rect(self.image, self.render_scale)
     self.fired = False
     self.last_shot = pygame.time.get_ticks()
+    self.shot_timer = None
 
-  def update(self, player):
+  #returns the arrow fired this frame, with the projectile engine the arrow has no sprite and True is returned instead
+  def update(self, player, camera, projectiles = None):
     shot_cooldown = 300
     arrow = None
 
     self.rect.center = player.rect.center
 
-    pos = pygame.mouse.get_pos()
+    #mouse position is in screen coordinates, the bow is in world coordinates
+    pos = camera.to_world(pygame.mouse.get_pos())
     x_dist = pos[0] - self.rect.centerx
     y_dist = -(pos[1] - self.rect.centery)#-ve because pygame y coordinates increase down the screen
     self.angle = math.degrees(math.atan2(y_dist, x_dist))
 
     #get mouseclick
-    if pygame.mouse.get_pressed()[0] and self.fired == False and (pygame.time.get_ticks() - self.last_shot) >= shot_cooldown:
-      arrow = Arrow(self.arrow_image, self.rect.centerx, self.rect.centery, self.angle)
+    if self.shot_timer is None:
+      self.shot_timer = timers.start(self.last_shot + shot_cooldown)
+    if pygame.mouse.get_pressed()[0] and self.fired == False and self.shot_timer.expired:
+      if projectiles:
+        arrow = projectiles.fire_arrow(self.rect.centerx, self.rect.centery, self.angle)
+      else:
+        arrow = Arrow(self.arrow_image, self.rect.centerx, self.rect.centery, self.angle)
       self.fired = True
       self.last_shot = pygame.time.get_ticks()
+      self.shot_timer = timers.start(self.last_shot + shot_cooldown)
     #reset mouseclick
     if pygame.mouse.get_pressed()[0] == False:
       self.fired = False
@@ -36,89 +51,103 @@ class Weapon():
 
     return arrow
 
-  def draw(self, surface):
-    self.image = pygame.transform.rotate(self.original_image, self.angle)
-    surface.blit(self.image, ((self.rect.centerx - int(self.image.get_width()/2)), self.rect.centery - int(self.image.get_height()/2)))
+  def draw(self, surface, camera):
+    self.image = rotation_cache.get(self.original_image, self.angle)
+    centerx, centery = camera.apply_pos(self.rect.center)
+    return surface.blit(self.image, ((centerx - int(self.image.get_width()/2)), centery - int(self.image.get_height()/2)))
 
 
 class Arrow(pygame.sprite.Sprite):
+  #Sprite keeps a dict for its group bookkeeping, the arrow's own attributes go in slots
+  __slots__ = ("original_image", "angle", "image", "render_scale", "rect", "dx", "dy")
+
   def __init__(self, image, x, y, angle):
     pygame.sprite.Sprite.__init__(self)
     self.original_image = image
     self.angle = angle
-    self.image = pygame.transform.rotate(self.original_image, self.angle - 90)
-    self.rect = self.image.get_rect()
+    self.image = rotation_cache.get(self.original_image, self.angle - 90)
+    self.render_scale = sprite_render_scale(constants.WEAPON_SCALE)
+    self.rect = world_rect(self.image, self.render_scale)
     self.rect.center = (x, y)
     #calculate the horizontal and vertical speeds based on the angle
     self.dx = math.cos(math.radians(self.angle)) * constants.ARROW_SPEED
     self.dy = -(math.sin(math.radians(self.angle)) * constants.ARROW_SPEED)#-ve because pygame y coordiate increases down the screen
 
 
-  def update(self, screen_scroll, obstacle_tiles, enemy_list):
+  def update(self, camera, world, particles = None):
     #reset variables
     damage = 0
     damage_pos = None
 
     #reposition based on speed
-    self.rect.x += screen_scroll[0] + self.dx
-    self.rect.y += screen_scroll[1] + self.dy
+    self.rect.x += self.dx
+    self.rect.y += self.dy
 
     #check for collision between arrow and tile walls
-    for obstacle in obstacle_tiles:
-      if obstacle[1].colliderect(self.rect):
-        self.kill()
+    if world.obstacles_touching(self.rect):
+      self.kill()
 
     #check if arrow has gone off screen
-    if self.rect.right < 0 or self.rect.left > constants.SCREEN_WIDTH or self.rect.bottom < 0 or self.rect.top > constants.SCREEN_HEIGHT:
+    if not camera.viewport.colliderect(self.rect):
       self.kill()
 
-    #check collision between arrow and enemies
-    for enemy in enemy_list:
-      if enemy.rect.colliderect(self.rect) and enemy.alive:
+    #check collision between arrow and the enemies near it
+    for enemy in world.entities.query(self.rect, "enemy"):
+      if enemy.alive:
         damage = 10 + random.randint(-5, 5)
         damage_pos = enemy.rect
         enemy.health -= damage
         enemy.hit = True
+        if particles:
+          particles.emit(self.rect.center, 12, constants.RED, 3, 20)
+          if enemy.health <= 0:
+            particles.emit(enemy.rect.center, 40, constants.PINK, 4, 40)
         self.kill()
         break
 
     return damage, damage_pos
 
-  def draw(self, surface):
-    surface.blit(self.image, ((self.rect.centerx - int(self.image.get_width()/2)), self.rect.centery - int(self.image.get_height()/2)))
+  def draw(self, surface, camera):
+    centerx, centery = camera.apply_pos(self.rect.center)
+    return surface.blit(self.image, ((centerx - int(self.image.get_width()/2)), centery - int(self.image.get_height()/2)))
 
 
 class Fireball(pygame.sprite.Sprite):
+  __slots__ = ("original_image", "angle", "image", "render_scale", "rect", "dx", "dy")
+
   def __init__(self, image, x, y, target_x, target_y):
     pygame.sprite.Sprite.__init__(self)
     self.original_image = image
     x_dist = target_x - x
     y_dist = -(target_y - y)
     self.angle = math.degrees(math.atan2(y_dist, x_dist))
-    self.image = pygame.transform.rotate(self.original_image, self.angle - 90)
-    self.rect = self.image.get_rect()
+    self.image = rotation_cache.get(self.original_image, self.angle - 90)
+    self.render_scale = sprite_render_scale(constants.FIREBALL_SCALE)
+    self.rect = world_rect(self.image, self.render_scale)
     self.rect.center = (x, y)
     #calculate the horizontal and vertical speeds based on the angle
     self.dx = math.cos(math.radians(self.angle)) * constants.FIREBALL_SPEED
     self.dy = -(math.sin(math.radians(self.angle)) * constants.FIREBALL_SPEED)#-ve because pygame y coordiate increases down the screen
 
 
-  def update(self, screen_scroll, player):
+  def update(self, camera, world):
     #reposition based on speed
-    self.rect.x += screen_scroll[0] + self.dx
-    self.rect.y += screen_scroll[1] + self.dy
+    self.rect.x += self.dx
+    self.rect.y += self.dy
 
     #check if fireball has gone off screen
-    if self.rect.right < 0 or self.rect.left > constants.SCREEN_WIDTH or self.rect.bottom < 0 or self.rect.top > constants.SCREEN_HEIGHT:
+    if not camera.viewport.colliderect(self.rect):
       self.kill()
 
     #check collision between self and player
-    if player.rect.colliderect(self.rect) and player.hit == False:
-      player.hit = True
-      player.last_hit = pygame.time.get_ticks()
-      player.health -= 10
-      self.kill()
+    for player in world.entities.query(self.rect, "player"):
+      if player.hit == False:
+        player.hit = True
+        player.last_hit = pygame.time.get_ticks()
+        player.health -= 10
+        self.kill()
 
 
-  def draw(self, surface):
-    surface.blit(self.image, ((self.rect.centerx - int(self.image.get_width()/2)), self.rect.centery - int(self.image.get_height()/2)))
+  def draw(self, surface, camera):
+    centerx, centery = camera.apply_pos(self.rect.center)
+    return surface.blit(self.image, ((centerx - int(self.image.get_width()/2)), centery - int(self.image.get_height()/2)))
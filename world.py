@@ -1,64 +1,231 @@
+import pygame
+import numpy as np
 from character import Character
 from items import Item
+from pathfinding import FlowField
+from fov import FogOfWar
+from lighting import Lighting
+from spatial_hash import SpatialHash
 import constants
 
 class World():
   def __init__(self):
-    self.map_tiles = []
-    self.obstacle_tiles = []
+    #tile images looked up by the tile ids stored in the grid, -1 marks an empty cell
+    self.tile_images = []
+    self.tile_grid = np.full((0, 0), -1, dtype=np.int16)
     self.exit_tile = None
     self.item_list = []
     self.player = None
     self.character_list = []
+    self.chunks = {}
+    #images stamped onto the map, kept per chunk so re-baking a chunk doesn't lose them
+    self.decals = {}
+    self.walkable = np.ones((0, 0), dtype=bool)
+    self.sight_cache = {}
+    self.flow_field = FlowField(self.walkable)
+    self.fog = None
+    self.lighting = None
+    #characters and items, kept up to date as they move, projectiles look up what they hit here
+    self.entities = SpatialHash()
+    #tile each entity was last seen on, and the entities that moved to a new tile or left the world since the minimap last looked
+    self.entity_tiles = {}
+    self.changed = set()
 
 
   def process_data(self, data, tile_list, item_images, mob_animations):
     self.level_length = len(data)
+    self.tile_images = tile_list
+    self.walkable = np.ones((len(data), max([len(row) for row in data], default = 0)), dtype=bool)
+    self.tile_grid = np.full(self.walkable.shape, -1, dtype=np.int16)
     #iterate through each value in level data file
     for y, row in enumerate(data):
       for x, tile in enumerate(row):
-        image = tile_list[tile]
-        image_rect = image.get_rect()
+        tile_id = tile
         image_x = x * constants.TILE_SIZE
         image_y = y * constants.TILE_SIZE
-        image_rect.center = (image_x, image_y)
-        tile_data = [image, image_rect, image_x, image_y]
 
         if tile == 7:
-          self.obstacle_tiles.append(tile_data)
+          self.walkable[y, x] = False
         elif tile == 8:
-          self.exit_tile = tile_data
+          self.exit_tile = self.tile_rect(x, y)
         elif tile == 9:
           coin = Item(image_x, image_y, 0, item_images[0])
           self.item_list.append(coin)
-          tile_data[0] = tile_list[0]
+          tile_id = 0
         elif tile == 10:
           potion = Item(image_x, image_y, 1, [item_images[1]])
           self.item_list.append(potion)
-          tile_data[0] = tile_list[0]
+          tile_id = 0
         elif tile == 11:
           player = Character(image_x, image_y, 100, mob_animations, 0, False, 1)
           self.player = player
-          tile_data[0] = tile_list[0]
+          tile_id = 0
         elif tile >= 12 and tile <= 16:
           enemy = Character(image_x, image_y, 100, mob_animations, tile - 11, False, 1)
           self.character_list.append(enemy)
-          tile_data[0] = tile_list[0]
+          tile_id = 0
         elif tile == 17:
           enemy = Character(image_x, image_y, 100, mob_animations, 6, True, 2)
           self.character_list.append(enemy)
-          tile_data[0] = tile_list[0]
-          
-        #add image data to main tiles list
-        if tile >= 0:
-          self.map_tiles.append(tile_data)
-
-  def update(self, screen_scroll):
-    for tile in self.map_tiles:
-      tile[2] += screen_scroll[0]
-      tile[3] += screen_scroll[1]
-      tile[1].center = (tile[2], tile[3])
-
-  def draw(self, surface):
-    for tile in self.map_tiles:
-      surface.blit(tile[0], tile[1])
\ No newline at end of file
+          tile_id = 0
+
+        #the floor under items and characters is stored as a plain floor tile
+        self.tile_grid[y, x] = tile_id
+
+    self.entities.insert(self.player, "player")
+    for enemy in self.character_list:
+      self.entities.insert(enemy, "enemy")
+    for item in self.item_list:
+      self.entities.insert(item, "item")
+
+    #render the static tile layer into chunks once
+    self.bake_chunks()
+    self.flow_field = FlowField(self.walkable)
+    if constants.FOG_OF_WAR:
+      self.fog = FogOfWar(self.walkable)
+    if constants.LIGHTING:
+      self.lighting = Lighting(self.walkable, self.tile_grid)
+
+  def bake_chunks(self):
+    self.chunks = {}
+    rows, cols = self.tile_grid.shape
+    for cy in range(0, (rows + constants.CHUNK_SIZE - 1) // constants.CHUNK_SIZE):
+      for cx in range(0, (cols + constants.CHUNK_SIZE - 1) // constants.CHUNK_SIZE):
+        self.bake_chunk(cx, cy)
+
+  def bake_chunk(self, cx, cy):
+    chunk_pixels = constants.CHUNK_SIZE * constants.TILE_SIZE
+    chunk = pygame.Surface((chunk_pixels // constants.RENDER_SCALE, chunk_pixels // constants.RENDER_SCALE)).convert()
+    chunk.fill(constants.BG)
+    first_x = cx * constants.CHUNK_SIZE
+    first_y = cy * constants.CHUNK_SIZE
+    tiles = self.tile_grid[first_y:first_y + constants.CHUNK_SIZE, first_x:first_x + constants.CHUNK_SIZE]
+    ys, xs = np.nonzero(tiles >= 0)
+    for y, x, tile_id in zip(ys.tolist(), xs.tolist(), tiles[ys, xs].tolist()):
+      chunk.blit(self.tile_images[tile_id], (x * constants.TILE_SIZE // constants.RENDER_SCALE, y * constants.TILE_SIZE // constants.RENDER_SCALE))
+    #world position of the chunk's top left corner
+    origin_x = cx * chunk_pixels - constants.TILE_SIZE // 2
+    origin_y = cy * chunk_pixels - constants.TILE_SIZE // 2
+    decals = self.decals.get((cx, cy), [])
+    for image, pos in decals:
+      chunk.blit(image, ((pos[0] - origin_x) // constants.RENDER_SCALE, (pos[1] - origin_y) // constants.RENDER_SCALE))
+    empty = len(ys) == 0 and not decals
+    #chunks without any tiles are never drawn
+    if empty:
+      self.chunks.pop((cx, cy), None)
+    else:
+      self.chunks[(cx, cy)] = chunk
+
+  #change the id of a single tile and re-render the chunk it belongs to
+  def set_tile(self, x, y, tile_id):
+    self.tile_grid[y, x] = tile_id
+    self.bake_chunk(x // constants.CHUNK_SIZE, y // constants.CHUNK_SIZE)
+
+  #stamp an image into the map at a world rect, every chunk the rect overlaps is re-rendered
+  def add_decal(self, image, rect):
+    first_x, first_y = self.tile_at(rect.left, rect.top)
+    first_x = max(first_x, 0)
+    first_y = max(first_y, 0)
+    last_x, last_y = self.tile_at(rect.right - 1, rect.bottom - 1)
+    for cy in range(first_y // constants.CHUNK_SIZE, last_y // constants.CHUNK_SIZE + 1):
+      for cx in range(first_x // constants.CHUNK_SIZE, last_x // constants.CHUNK_SIZE + 1):
+        self.decals.setdefault((cx, cy), []).append((image, rect.topleft))
+        self.bake_chunk(cx, cy)
+
+  #world rect covered by a grid cell
+  def tile_rect(self, x, y):
+    rect = pygame.Rect(0, 0, constants.TILE_SIZE, constants.TILE_SIZE)
+    rect.center = (x * constants.TILE_SIZE, y * constants.TILE_SIZE)
+    return rect
+
+  #call after an entity's rect changed, keeps the spatial hash in step and notes when it entered a new tile
+  def move_entity(self, obj):
+    self.entities.move(obj)
+    tile = self.tile_at(obj.rect.centerx, obj.rect.centery)
+    if self.entity_tiles.get(obj) != tile:
+      self.entity_tiles[obj] = tile
+      self.changed.add(obj)
+
+  #take a dead character or collected item out of the world
+  def remove_entity(self, obj):
+    self.entities.remove(obj)
+    self.entity_tiles.pop(obj, None)
+    self.changed.add(obj)
+
+  #grid cell containing a world position (tiles are centred on multiples of TILE_SIZE)
+  def tile_at(self, x, y):
+    return int((x + constants.TILE_SIZE // 2) // constants.TILE_SIZE), int((y + constants.TILE_SIZE // 2) // constants.TILE_SIZE)
+
+  #rects of the wall tiles overlapping a rect, looked up from the grid cells the rect covers
+  def obstacles_touching(self, rect):
+    first_x, first_y = self.tile_at(rect.left, rect.top)
+    last_x, last_y = self.tile_at(rect.right - 1, rect.bottom - 1)
+    first_x = max(first_x, 0)
+    first_y = max(first_y, 0)
+    walls = ~self.walkable[first_y:max(last_y + 1, 0), first_x:max(last_x + 1, 0)]
+    obstacles = []
+    for y, x in zip(*np.nonzero(walls)):
+      obstacles.append(self.tile_rect(first_x + x, first_y + y))
+    return obstacles
+
+  #clear results that are only valid for a single frame, returns True if the fog or lighting changed
+  def update(self, player):
+    self.sight_cache = {}
+    player_tile = self.tile_at(player.rect.centerx, player.rect.centery)
+    #the flow field, field of view and lightmap are only rebuilt when the player moves to a new tile
+    self.flow_field.update(player_tile)
+    changed = False
+    if self.fog:
+      changed = self.fog.update(player_tile)
+    if self.lighting:
+      changed = self.lighting.update(player_tile) or changed
+    return changed
+
+  #check whether a world position is inside the player's field of view
+  def is_visible(self, pos):
+    if not self.fog:
+      return True
+    return self.fog.is_visible(self.tile_at(pos[0], pos[1]))
+
+  #check whether a straight line between two world positions is free of walls
+  def line_of_sight(self, start, end):
+    start_tile = self.tile_at(start[0], start[1])
+    end_tile = self.tile_at(end[0], end[1])
+    key = (start_tile, end_tile)
+    if key not in self.sight_cache:
+      self.sight_cache[key] = self.trace_line(start_tile, end_tile)
+    return self.sight_cache[key]
+
+  #walk every grid cell the line between two tile centres passes through
+  def trace_line(self, start_tile, end_tile):
+    x, y = start_tile
+    dx = abs(end_tile[0] - x)
+    dy = abs(end_tile[1] - y)
+    step_x = 1 if end_tile[0] > x else -1
+    step_y = 1 if end_tile[1] > y else -1
+    error = dx - dy
+    rows, cols = self.walkable.shape
+    for _ in range(1 + dx + dy):
+      if 0 <= y < rows and 0 <= x < cols and not self.walkable[y, x]:
+        return False
+      if error > 0:
+        x += step_x
+        error -= 2 * dy
+      else:
+        y += step_y
+        error += 2 * dx
+    return True
+
+  def draw(self, surface, camera):
+    #only blit the chunks that overlap the camera viewport
+    chunk_pixels = constants.CHUNK_SIZE * constants.TILE_SIZE
+    view = camera.viewport
+    first_x, first_y = self.tile_at(view.left, view.top)
+    last_x, last_y = self.tile_at(view.right - 1, view.bottom - 1)
+    for cy in range(first_y // constants.CHUNK_SIZE, last_y // constants.CHUNK_SIZE + 1):
+      for cx in range(first_x // constants.CHUNK_SIZE, last_x // constants.CHUNK_SIZE + 1):
+        chunk = self.chunks.get((cx, cy))
+        if chunk:
+          surface.blit(chunk, camera.apply_pos((cx * chunk_pixels - constants.TILE_SIZE // 2, cy * chunk_pixels - constants.TILE_SIZE // 2)))
+    if self.lighting:
+      self.lighting.draw(surface, camera)
\ No newline at end of file